@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+儲存層效能測試
+==============
+比較舊版逐筆 INSERT OR REPLACE (rollback journal) 與現行
+DatabaseManager.save_articles (WAL + executemany upsert) 寫入大量文章的耗時。
+
+使用方式：
+    uv run benchmarks/bench_storage.py            # 預設 10,000 篇
+    uv run benchmarks/bench_storage.py -n 50000
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from src.database.storage import DatabaseManager
+from src.models import Article
+
+
+def make_articles(n: int):
+    now = datetime.now(timezone.utc)
+    return [
+        Article(
+            id=f"bench-{i}",
+            title=f"Benchmark article {i}",
+            authors=["Bench"],
+            summary="lorem ipsum " * 20,
+            url=f"https://example.com/{i}",
+            source="bench",
+            published_date=now,
+            tags=["bench", "storage"],
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_save(db_path: str, articles):
+    """舊版寫法：預設 journal、每篇一次 execute"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        for art in articles:
+            cursor.execute("""
+                INSERT OR REPLACE INTO articles 
+                (id, title, authors, summary, ai_summary, tags, url, source, published_date, trust_score, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                art.id, art.title, ",".join(art.authors), art.summary, art.ai_summary,
+                json.dumps(art.tags), art.url, art.source, art.published_date.isoformat(),
+                art.trust_score, datetime.now().isoformat()
+            ))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatabaseManager 寫入效能測試")
+    parser.add_argument("-n", type=int, default=10_000, help="文章數量")
+    args = parser.parse_args()
+    
+    logger.remove()
+    articles = make_articles(args.n)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = str(Path(tmp) / "legacy.db")
+        db = DatabaseManager(legacy_path)
+        db.close()
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        start = time.perf_counter()
+        legacy_save(legacy_path, articles)
+        legacy_secs = time.perf_counter() - start
+        
+        db = DatabaseManager(str(Path(tmp) / "current.db"))
+        start = time.perf_counter()
+        db.save_articles(articles)
+        current_secs = time.perf_counter() - start
+        
+        # 第二次寫入全部走 upsert 更新路徑
+        start = time.perf_counter()
+        db.save_articles(articles)
+        upsert_secs = time.perf_counter() - start
+        db.close()
+    
+    print(f"文章數: {args.n:,}")
+    print(f"舊版逐筆寫入        : {legacy_secs:.3f}s ({args.n / legacy_secs:,.0f} 篇/秒)")
+    print(f"WAL + executemany   : {current_secs:.3f}s ({args.n / current_secs:,.0f} 篇/秒)")
+    print(f"WAL + upsert (更新) : {upsert_secs:.3f}s ({args.n / upsert_secs:,.0f} 篇/秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,7 @@ async def main():
     
     # 初始化資料庫
     db = DatabaseManager()
-    processed_ids = db.get_processed_ids()
-    logger.info(f"📊 目前資料庫中已有 {len(processed_ids)} 條記錄")
+    logger.info(f"📊 目前資料庫中已有 {db.count_articles()} 條記錄")
 
     # 1. 定義資訊源配置 (新增 HN)
     configs = [
@@ -32,13 +31,16 @@ async def main():
     
     # 2. 抓取並過濾
     raw_articles = []
+    crawlers = []
     
     for config in configs:
         crawler_cls = CRAWLER_MAP.get(config.name)
         if not crawler_cls:
             continue
         crawler = crawler_cls(config)
+        crawlers.append(crawler)
         fetched = await crawler.fetch()
+        processed_ids = db.get_existing_ids(a.id for a in fetched)
         new_items = [a for a in fetched if a.id not in processed_ids]
         raw_articles.extend(new_items)
         logger.info(f"📥 {config.name}: 獲得 {len(fetched)} 條，其中 {len(new_items)} 條為新內容")
@@ -64,8 +66,10 @@ async def main():
     refiner = RefinerEngine()
     refined_articles = await refiner.batch_refine(to_refine, top_n=len(to_refine))
     
-    # 5. 保存結果
+    # 5. 保存結果 (寫入後才保存 Feed 驗證器)
     db.save_articles(refined_articles)
+    for crawler in crawlers:
+        await crawler.commit_validators()
     
     logger.info(f"✅ 展示本輪提煉的 Top {len(refined_articles)} 知識:")
     
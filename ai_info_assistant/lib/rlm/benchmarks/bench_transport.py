@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Round-trip latency of LMHandler transports: TCP loopback vs Unix domain socket.
+
+Each request goes through the same path as llm_query() (send_lm_request over the
+pooled connection) against a handler whose client echoes instantly, so the timings
+are pure transport + framing overhead. The "direct" rows are LocalREPL's in-process
+dispatch (LMHandler.handle_request), i.e. the floor with no transport at all.
+
+Usage:
+    uv run python benchmarks/bench_transport.py
+    uv run python benchmarks/bench_transport.py -n 2000 --sizes 100 10000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from rlm.clients.base_lm import BaseLM
+from rlm.core.comms_utils import LMRequest, close_connections, send_lm_request
+from rlm.core.lm_handler import LMHandler, unix_sockets_supported
+from rlm.core.types import ModelUsageSummary, UsageSummary
+
+
+class EchoLM(BaseLM):
+    """Client that answers immediately with a short fixed response."""
+
+    def __init__(self):
+        super().__init__(model_name="echo")
+
+    def completion(self, prompt):
+        return "ok"
+
+    async def acompletion(self, prompt):
+        return "ok"
+
+    def get_usage_summary(self):
+        return UsageSummary(model_usage_summaries={"echo": ModelUsageSummary(1, 0, 0)})
+
+    def get_last_usage(self):
+        return self.get_usage_summary()
+
+
+def measure(transport: str, prompt: str, n: int) -> list[float]:
+    """Return per-request round-trip times in seconds."""
+    direct = transport == "direct"
+    with LMHandler(client=EchoLM(), transport="tcp" if direct else transport) as handler:
+        request = LMRequest(prompt=prompt)
+
+        def call():
+            if direct:
+                return handler.handle_request(request)
+            return send_lm_request(handler.address, request)
+
+        # Warm up the pooled connection
+        for _ in range(min(20, n)):
+            call()
+
+        timings = []
+        for _ in range(n):
+            start = time.perf_counter()
+            response = call()
+            timings.append(time.perf_counter() - start)
+            if not response.success:
+                raise RuntimeError(response.error)
+    close_connections()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=1000, help="requests per measurement")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 100_000, 4_000_000],
+        help="prompt sizes in characters",
+    )
+    args = parser.parse_args()
+
+    transports = ["tcp"] + (["unix"] if unix_sockets_supported() else []) + ["direct"]
+    print(f"{'prompt size':>12} {'transport':>9} {'p50 (us)':>10} {'p99 (us)':>10} {'MB/s':>8}")
+    for size in args.sizes:
+        prompt = "x" * size
+        # Large prompts take longer per request; keep total runtime reasonable
+        n = max(20, min(args.n, args.n * 100_000 // max(size, 1)))
+        for transport in transports:
+            timings = sorted(measure(transport, prompt, n))
+            p50 = statistics.median(timings)
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            throughput = size / p50 / 1e6
+            print(
+                f"{size:>12,} {transport:>9} {p50 * 1e6:>10.1f} {p99 * 1e6:>10.1f} "
+                f"{throughput:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
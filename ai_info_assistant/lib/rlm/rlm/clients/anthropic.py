@@ -12,6 +12,9 @@ class AnthropicClient(BaseLM):
     LM Client for running models with the Anthropic API.
     """
 
+    # The SDK retries connection errors, 408/429 and 5xx itself (max_retries=2).
+    retries_internally = True
+
     def __init__(
         self,
         api_key: str,
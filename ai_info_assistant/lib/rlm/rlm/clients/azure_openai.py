@@ -19,6 +19,9 @@ class AzureOpenAIClient(BaseLM):
     LM Client for running models with the Azure OpenAI API.
     """
 
+    # The SDK retries connection errors, 408/429 and 5xx itself (max_retries=2).
+    retries_internally = True
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -10,8 +10,14 @@ class BaseLM(ABC):
     does so in a model-agnostic way, so this class provides a base interface for all language models.
     """
 
-    def __init__(self, model_name: str, **kwargs):
+    # Whether the provider SDK retries failed calls itself (with its own backoff); the
+    # LM Handler then only limits such clients and leaves retrying to the SDK.
+    retries_internally: bool = False
+
+    def __init__(self, model_name: str, max_in_flight: int | None = None, **kwargs):
         self.model_name = model_name
+        # Cap on concurrent calls to this client through the LM Handler (None: handler default)
+        self.max_in_flight = max_in_flight
         self.kwargs = kwargs
 
     @abstractmethod
@@ -22,6 +22,9 @@ class OpenAIClient(BaseLM):
     LM Client for running models with the OpenAI API. Works with vLLM as well.
     """
 
+    # The SDK retries connection errors, 408/429 and 5xx itself (max_retries=2).
+    retries_internally = True
+
     def __init__(
         self,
         api_key: str | None = None,
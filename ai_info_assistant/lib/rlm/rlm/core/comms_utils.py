@@ -1,18 +1,35 @@
 """
 Communication utilities for RLM socket protocol.
 
-Protocol: 4-byte big-endian length prefix + JSON payload.
+Protocol: 4-byte big-endian length prefix + JSON (or msgpack) payload.
 Used for communication between LMHandler and environment subprocesses.
+
+Transport is chosen from the address: a (host, port) tuple connects over TCP, a
+string is the filesystem path of a Unix domain socket.
+
+Messages that carry an "id" field are multiplexed: the handler answers them on the
+same connection (possibly out of order) with the same "id", so one long-lived
+connection can serve many concurrent requests. Messages without an "id" get
+exactly one response, which keeps one-shot clients working.
 """
 
+import itertools
 import json
+import os
 import socket
 import struct
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
 from typing import Any
 
 from rlm.core.types import RLMChatCompletion
 
+try:
+    import msgpack
+except ImportError:  # optional dependency: pip install "rlm[msgpack]"
+    msgpack = None
+
 # =============================================================================
 # Message Dataclasses
 # =============================================================================
@@ -63,11 +80,14 @@ class LMResponse:
     """Response message from the LM Handler.
 
     Supports both single response (chat_completion) and batched responses (chat_completions).
+    In a batched response a prompt that failed has None in chat_completions and its
+    message at the same index of errors; the other prompts still succeed.
     """
 
     error: str | None = None
     chat_completion: RLMChatCompletion | None = None
-    chat_completions: list[RLMChatCompletion] | None = None
+    chat_completions: list[RLMChatCompletion | None] | None = None
+    errors: list[str | None] | None = None
 
     @property
     def success(self) -> bool:
@@ -89,9 +109,12 @@ class LMResponse:
             }
         if self.chat_completions is not None:
             return {
-                "chat_completions": [c.to_dict() for c in self.chat_completions],
+                "chat_completions": [
+                    c.to_dict() if c is not None else None for c in self.chat_completions
+                ],
                 "chat_completion": None,
                 "error": None,
+                "errors": self.errors,
             }
         if self.chat_completion is not None:
             return {
@@ -110,7 +133,10 @@ class LMResponse:
         """Create from dict."""
         chat_completions = None
         if data.get("chat_completions"):
-            chat_completions = [RLMChatCompletion.from_dict(c) for c in data["chat_completions"]]
+            chat_completions = [
+                RLMChatCompletion.from_dict(c) if c is not None else None
+                for c in data["chat_completions"]
+            ]
 
         chat_completion = None
         if data.get("chat_completion"):
@@ -120,6 +146,7 @@ class LMResponse:
             error=data.get("error"),
             chat_completion=chat_completion,
             chat_completions=chat_completions,
+            errors=data.get("errors"),
         )
 
     @classmethod
@@ -128,86 +155,366 @@ class LMResponse:
         return cls(chat_completion=chat_completion)
 
     @classmethod
-    def batched_success_response(cls, chat_completions: list[RLMChatCompletion]) -> "LMResponse":
-        """Create a successful batched response."""
-        return cls(chat_completions=chat_completions)
+    def batched_success_response(
+        cls,
+        chat_completions: list[RLMChatCompletion | None],
+        errors: list[str | None] | None = None,
+    ) -> "LMResponse":
+        """Create a batched response (errors marks prompts that failed individually)."""
+        if errors is not None and all(e is None for e in errors):
+            errors = None
+        return cls(chat_completions=chat_completions, errors=errors)
 
     @classmethod
     def error_response(cls, error: str) -> "LMResponse":
         """Create an error response."""
         return cls(error=error)
 
+    def unbatch(self, count: int) -> list["LMResponse"]:
+        """Split a batched response into one response per prompt, in prompt order."""
+        if not self.success:
+            return [LMResponse.error_response(self.error)] * count
+        if self.chat_completions is None:
+            return [LMResponse.error_response("No completions returned")] * count
+        errors = self.errors or [None] * len(self.chat_completions)
+        return [
+            LMResponse.success_response(completion)
+            if completion is not None
+            else LMResponse.error_response(error or "No completion returned")
+            for completion, error in zip(self.chat_completions, errors, strict=True)
+        ]
+
 
 # =============================================================================
 # Socket Protocol Helpers
 # =============================================================================
 
+# (host, port) for TCP, or a filesystem path for a Unix domain socket.
+Address = tuple[str, int] | str
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+
+_HEADER = struct.Struct(">I")
+
+# Payloads at least this large are sent with scatter/gather I/O instead of being
+# concatenated with the header, so multi-megabyte prompts are not copied.
+_ZERO_COPY_THRESHOLD = 64 * 1024
+
+
+def default_wire_format() -> str:
+    """Wire format for outgoing requests: RLM_WIRE_FORMAT, else msgpack when installed."""
+    requested = os.environ.get("RLM_WIRE_FORMAT", WIRE_MSGPACK)
+    if requested == WIRE_MSGPACK and msgpack is not None:
+        return WIRE_MSGPACK
+    return WIRE_JSON
+
+
+def encode_message(data: dict, wire_format: str = WIRE_JSON) -> bytes:
+    """Encode a message body in the given wire format."""
+    if wire_format == WIRE_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack wire format requested but msgpack is not installed")
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data).encode("utf-8")
+
+
+def decode_message(payload: bytes | bytearray) -> tuple[Any, str]:
+    """Decode a message body, detecting its wire format.
+
+    JSON objects always start with "{", which is never the first byte of a msgpack
+    map, so the format can be told apart without an extra header byte.
+
+    Returns:
+        (decoded data, wire format)
+    """
+    if payload[:1] == b"{" or msgpack is None:
+        return json.loads(payload), WIRE_JSON
+    return msgpack.unpackb(payload, raw=False), WIRE_MSGPACK
+
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    """Send one length-prefixed frame."""
+    header = _HEADER.pack(len(payload))
+    if len(payload) < _ZERO_COPY_THRESHOLD or not hasattr(sock, "sendmsg"):
+        sock.sendall(header + payload)
+        return
+
+    sent = sock.sendmsg([header, payload])
+    if sent < len(header):
+        sock.sendall(header[sent:])
+        sent = len(header)
+    if sent - len(header) < len(payload):
+        sock.sendall(memoryview(payload)[sent - len(header) :])
+
+
+def _recv_exact(sock: socket.socket, length: int) -> bytearray | None:
+    """Read exactly `length` bytes into a preallocated buffer.
+
+    Returns None if the connection is closed before any byte arrives.
+
+    Raises:
+        ConnectionError: If the connection closes part way through.
+    """
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            if received == 0:
+                return None
+            raise ConnectionError("Connection closed before message complete")
+        received += n
+    return buffer
+
 
-def socket_send(sock: socket.socket, data: dict) -> None:
-    """Send a length-prefixed JSON message over socket.
+def recv_message(sock: socket.socket) -> tuple[Any, str] | None:
+    """Receive one length-prefixed message.
 
-    Protocol: 4-byte big-endian length prefix + UTF-8 JSON payload.
+    Returns:
+        (decoded data, wire format), or None if the connection was closed cleanly.
+
+    Raises:
+        ConnectionError: If connection closes mid-message.
     """
-    payload = json.dumps(data).encode("utf-8")
-    sock.sendall(struct.pack(">I", len(payload)) + payload)
+    raw_len = _recv_exact(sock, _HEADER.size)
+    if raw_len is None:
+        return None
+
+    length = _HEADER.unpack(raw_len)[0]
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        raise ConnectionError("Connection closed before message complete")
+    return decode_message(payload)
+
+
+def socket_send(sock: socket.socket, data: dict, wire_format: str = WIRE_JSON) -> None:
+    """Send a length-prefixed message over socket.
+
+    Protocol: 4-byte big-endian length prefix + UTF-8 JSON (or msgpack) payload.
+    """
+    _send_frame(sock, encode_message(data, wire_format))
 
 
 def socket_recv(sock: socket.socket) -> dict:
-    """Receive a length-prefixed JSON message from socket.
+    """Receive a length-prefixed message from socket.
 
-    Protocol: 4-byte big-endian length prefix + UTF-8 JSON payload.
+    Protocol: 4-byte big-endian length prefix + UTF-8 JSON (or msgpack) payload.
     Returns empty dict if connection closed before length received.
 
     Raises:
         ConnectionError: If connection closes mid-message.
     """
-    raw_len = sock.recv(4)
-    if not raw_len:
+    message = recv_message(sock)
+    if message is None:
         return {}
+    return message[0]
 
-    length = struct.unpack(">I", raw_len)[0]
-    payload = b""
-    while len(payload) < length:
-        chunk = sock.recv(length - len(payload))
-        if not chunk:
-            raise ConnectionError("Connection closed before message complete")
-        payload += chunk
 
-    return json.loads(payload.decode("utf-8"))
+def _connect(address: Address, timeout: float | None) -> socket.socket:
+    """Open a socket to an LM Handler address (TCP tuple or Unix socket path)."""
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
 
+    sock = socket.create_connection(tuple(address), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
 
-def socket_request(address: tuple[str, int], data: dict, timeout: int = 300) -> dict:
+
+def socket_request(address: Address, data: dict, timeout: int = 300) -> dict:
     """Send a request and receive a response over a new socket connection.
 
-    Opens a new TCP connection, sends the request, waits for response, then closes.
+    Opens a new connection, sends the request, waits for response, then closes.
+    Prefer `LMConnection` (via `get_connection`) for repeated requests.
 
     Args:
-        address: (host, port) tuple to connect to.
+        address: (host, port) tuple or Unix socket path to connect to.
         data: Dictionary to send as JSON.
         timeout: Socket timeout in seconds (default 300).
 
     Returns:
         Response dictionary.
     """
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.settimeout(timeout)
-        sock.connect(address)
+    with _connect(address, timeout) as sock:
         socket_send(sock, data)
         return socket_recv(sock)
 
 
+class RequestNotSentError(ConnectionError):
+    """The connection failed before the request was fully sent.
+
+    The handler only dispatches complete frames, so such a request was never
+    processed and is safe to retry.
+    """
+
+
+class LMConnection:
+    """Long-lived, multiplexed connection to an LM Handler.
+
+    Each request is tagged with a request ID; a background reader thread routes
+    responses back to the waiting caller, so any number of threads can share one
+    connection without paying connect cost per call.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        wire_format: str | None = None,
+        connect_timeout: float = 30,
+    ):
+        self.address = address
+        self.wire_format = wire_format or default_wire_format()
+        self.pid = os.getpid()
+        self._sock = _connect(address, connect_timeout)
+        self._sock.settimeout(None)  # per-request timeouts are enforced by the caller
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def request(self, data: dict, timeout: float | None = 300) -> dict:
+        """Send a request and wait for its response.
+
+        Raises:
+            RequestNotSentError: If the connection was closed or failed before the
+                request was fully sent.
+            ConnectionError: If the connection closes while awaiting the response
+                (the handler may already have processed the request).
+            TimeoutError: If no response arrives within `timeout` seconds.
+        """
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RequestNotSentError("LM connection is closed")
+            self._pending[request_id] = future
+
+        try:
+            try:
+                with self._send_lock:
+                    socket_send(self._sock, {**data, "id": request_id}, self.wire_format)
+            except OSError as e:
+                self.close()
+                raise RequestNotSentError(f"LM connection failed: {e}") from e
+            return future.result(timeout)
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def _read_loop(self) -> None:
+        error: Exception = ConnectionError("LM connection closed by handler")
+        try:
+            while True:
+                message = recv_message(self._sock)
+                if message is None:
+                    break
+                data = message[0]
+                with self._lock:
+                    future = self._pending.get(data.get("id")) if isinstance(data, dict) else None
+                if future is not None and not future.done():
+                    future.set_result(data)
+        except Exception as e:
+            if not self._closed:
+                error = ConnectionError(f"LM connection failed: {e}")
+        finally:
+            self._fail_pending(error)
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Close the connection; waiting requests fail with ConnectionError."""
+        if self._closed:
+            return
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._fail_pending(ConnectionError("LM connection closed"))
+
+
+_connections: dict[tuple, LMConnection] = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection(address: Address) -> LMConnection:
+    """Return the shared connection for `address`, opening one if needed.
+
+    Connections are per process (a forked child never reuses its parent's socket)
+    and are replaced transparently once closed.
+    """
+    key = (address if isinstance(address, str) else tuple(address), os.getpid())
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None or connection.closed:
+            # Drop connections to handlers that have since shut down.
+            for stale_key in [k for k, c in _connections.items() if c.closed]:
+                del _connections[stale_key]
+            connection = LMConnection(address)
+            _connections[key] = connection
+        return connection
+
+
+def close_connections() -> None:
+    """Close all shared LM Handler connections held by this process."""
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for connection in connections:
+        connection.close()
+
+
+def lm_request(address: Address, data: dict, timeout: int = 300) -> dict:
+    """Send a request over the shared connection for `address`.
+
+    A request that could not be sent (e.g. on a pooled connection the handler
+    already dropped) is retried once on a fresh connection. Failures after the
+    request went out are not retried, since the handler may already be running
+    the (billed) LM call.
+    """
+    try:
+        return get_connection(address).request(data, timeout)
+    except RequestNotSentError:
+        return get_connection(address).request(data, timeout)
+
+
 # =============================================================================
 # Typed Request Helpers
 # =============================================================================
 
 
 def send_lm_request(
-    address: tuple[str, int], request: LMRequest, timeout: int = 300, depth: int | None = None
+    address: Address, request: LMRequest, timeout: int = 300, depth: int | None = None
 ) -> LMResponse:
     """Send an LM request and return typed response.
 
     Args:
-        address: (host, port) tuple of LM Handler server.
+        address: (host, port) tuple or Unix socket path of LM Handler server.
         request: LMRequest to send.
         timeout: Socket timeout in seconds.
         depth: Optional depth to override request depth.
@@ -218,14 +525,14 @@ def send_lm_request(
     try:
         if depth is not None:
             request.depth = depth
-        response_data = socket_request(address, request.to_dict(), timeout)
+        response_data = lm_request(address, request.to_dict(), timeout)
         return LMResponse.from_dict(response_data)
     except Exception as e:
         return LMResponse.error_response(f"Request failed: {e}")
 
 
 def send_lm_request_batched(
-    address: tuple[str, int],
+    address: Address,
     prompts: list[str | dict[str, Any]],
     model: str | None = None,
     timeout: int = 300,
@@ -234,7 +541,7 @@ def send_lm_request_batched(
     """Send a batched LM request and return a list of typed responses.
 
     Args:
-        address: (host, port) tuple of LM Handler server.
+        address: (host, port) tuple or Unix socket path of LM Handler server.
         prompts: List of prompts to send.
         model: Optional model name to use.
         timeout: Socket timeout in seconds.
@@ -245,20 +552,8 @@ def send_lm_request_batched(
     """
     try:
         request = LMRequest(prompts=prompts, model=model, depth=depth)
-        response_data = socket_request(address, request.to_dict(), timeout)
-        response = LMResponse.from_dict(response_data)
-
-        if not response.success:
-            # Return error responses for all prompts
-            return [LMResponse.error_response(response.error)] * len(prompts)
-
-        if response.chat_completions is None:
-            return [LMResponse.error_response("No completions returned")] * len(prompts)
-
+        response_data = lm_request(address, request.to_dict(), timeout)
         # Convert batched response to list of individual responses
-        return [
-            LMResponse.success_response(chat_completion)
-            for chat_completion in response.chat_completions
-        ]
+        return LMResponse.from_dict(response_data).unbatch(len(prompts))
     except Exception as e:
         return [LMResponse.error_response(f"Request failed: {e}")] * len(prompts)
@@ -0,0 +1,222 @@
+"""
+Concurrency limiting and retry policy for LM calls.
+
+The LM Handler serves calls both from tasks on its own event loop (socket requests,
+batches) and from in-process caller threads (LocalREPL direct dispatch). A plain
+asyncio.Semaphore can only be awaited on its loop and a threading.Semaphore would
+block the loop, so ConcurrencyLimiter offers both acquire styles over one shared
+pool of slots. AIMDLimiter adapts that pool to upstream throttling.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+
+
+class ConcurrencyLimiter:
+    """Counting semaphore usable from threads (`slot`) and coroutines (`aslot`).
+
+    Waiters are served first-come first-served regardless of which style they use.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1")
+        self._limit = limit
+        self._in_use = 0
+        self._waiters: deque[Future] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def _try_acquire(self) -> Future | None:
+        """Take a slot, or enqueue and return a waiter future resolved on hand-off."""
+        with self._lock:
+            if self._in_use < self._limit and not self._waiters:
+                self._in_use += 1
+                return None
+            waiter: Future = Future()
+            self._waiters.append(waiter)
+            return waiter
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is free."""
+        waiter = self._try_acquire()
+        if waiter is not None:
+            waiter.result()
+
+    async def acquire_async(self) -> None:
+        """Wait (without blocking the event loop) until a slot is free."""
+        waiter = self._try_acquire()
+        if waiter is None:
+            return
+        try:
+            await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # cancel() fails once release() has handed us the slot; give it back
+            if not waiter.cancel():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest live waiter if any."""
+        with self._lock:
+            if self._in_use <= self._limit and self._wake_waiter():
+                return  # slot passes to the waiter; in_use is unchanged
+            self._in_use -= 1
+
+    def set_limit(self, limit: int) -> None:
+        """Change the number of slots. Lowering it takes effect as calls finish."""
+        with self._lock:
+            self._set_limit(limit)
+
+    def _set_limit(self, limit: int) -> None:
+        """Apply a new limit, waking waiters for any new free slots (caller holds the lock)."""
+        self._limit = max(1, limit)
+        while self._in_use < self._limit and self._wake_waiter():
+            self._in_use += 1
+
+    def _wake_waiter(self) -> bool:
+        """Resolve the oldest live waiter (caller holds the lock)."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.set_running_or_notify_cancel():
+                waiter.set_result(None)
+                return True
+        return False
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AIMDLimiter(ConcurrencyLimiter):
+    """Concurrency limit that adapts to upstream throttling.
+
+    Additive increase, multiplicative decrease: the limit starts at `max_limit`, is
+    multiplied by `backoff` when a call is throttled (at most once per `cooldown`
+    seconds, so one overload burst counts once), and grows by one after every `limit`
+    successful calls, back up to `max_limit`.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        super().__init__(max_limit)
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self._successes = 0
+        self._last_decrease = float("-inf")
+
+    def on_success(self) -> None:
+        """Record a successful call (additive increase)."""
+        with self._lock:
+            if self._limit >= self.max_limit:
+                return
+            self._successes += 1
+            if self._successes < self._limit:
+                return
+            self._successes = 0
+            self._set_limit(min(self.max_limit, self._limit + 1))
+
+    def on_throttle(self) -> None:
+        """Record a throttled call (multiplicative decrease)."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            self._set_limit(max(self.min_limit, int(self._limit * self.backoff)))
+
+
+# =============================================================================
+# Retry Policy
+# =============================================================================
+
+
+def status_code_of(error: BaseException) -> int | None:
+    """HTTP status carried by a client library exception, if any.
+
+    Covers the shapes used by the supported SDKs: `status_code` (openai, anthropic,
+    litellm), `response.status_code` (httpx) and `code` (google-genai).
+    """
+    for status in (
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+        getattr(error, "code", None),
+    ):
+        if isinstance(status, int) and 100 <= status < 600:
+            return status
+    return None
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether the error signals upstream overload (HTTP 429 or 5xx)."""
+    status = status_code_of(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+# Network failures of the supported SDKs that do not subclass the builtin
+# TimeoutError/ConnectionError, matched by class name so none of them has to be
+# installed: openai/anthropic/litellm (APIConnectionError, APITimeoutError, Timeout),
+# httpx and google-genai (TransportError) and requests (ConnectionError, Timeout).
+TRANSIENT_ERROR_NAMES = frozenset(
+    {"APIConnectionError", "APITimeoutError", "ConnectionError", "Timeout", "TransportError"}
+)
+
+
+def is_network_error(error: BaseException) -> bool:
+    """Whether the error is a (possibly SDK-wrapped) connection failure or timeout."""
+    if isinstance(error, TimeoutError | ConnectionError):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether retrying the same call may succeed."""
+    if is_throttled(error) or status_code_of(error) == 408:
+        return True
+    return is_network_error(error)
+
+
+def retry_delay(error: BaseException, attempt: int, base: float, cap: float = 30.0) -> float:
+    """Seconds to wait before retry `attempt` (0-based).
+
+    Honours a numeric Retry-After header; otherwise exponential backoff with jitter.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return min(cap, max(0.0, float(headers.get("retry-after"))))
+        except (TypeError, ValueError):
+            pass
+    return min(cap, base * 2**attempt) * random.uniform(0.5, 1.0)
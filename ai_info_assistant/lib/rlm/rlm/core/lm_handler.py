@@ -1,110 +1,104 @@
 """
 LMHandler - Routes LLM requests from the RLM process and environment subprocesses.
 
-Uses a multi-threaded socket server. Protocol: 4-byte length prefix + JSON payload.
+Runs one long-lived asyncio event loop on a background thread. The loop owns the
+socket server (TCP loopback or a Unix domain socket) and every LM call: single prompts
+run the client's blocking completion() on a thread pool, batched prompts run as tasks
+calling acompletion(), so async clients keep their connection pools across batches.
+A global limiter caps in-flight LM calls, and requests from a connection that
+disconnects are cancelled.
+
+Protocol: 4-byte length prefix + JSON (or msgpack) payload. Connections are long-lived:
+requests tagged with an "id" are processed concurrently and answered with the same "id"
+(see comms_utils).
 """
 
 import asyncio
+import concurrent.futures
+import itertools
+import os
+import shutil
+import socket
+import tempfile
+import threading
 import time
-from socketserver import StreamRequestHandler, ThreadingTCPServer
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread
+from typing import Any, Literal
 
 from rlm.clients.base_lm import BaseLM
-from rlm.core.comms_utils import LMRequest, LMResponse, socket_recv, socket_send
-from rlm.core.types import RLMChatCompletion, UsageSummary
-
-
-class LMRequestHandler(StreamRequestHandler):
-    """Socket handler for LLM completion requests."""
-
-    def handle(self):
-        try:
-            request_data = socket_recv(self.connection)
-            if not isinstance(request_data, dict):
-                response = LMResponse.error_response("Request must be a JSON object")
-                socket_send(self.connection, response.to_dict())
-                return
-
-            request = LMRequest.from_dict(request_data)
-            handler: LMHandler = self.server.lm_handler  # type: ignore
-
-            if request.is_batched:
-                # Batched request: process multiple prompts concurrently
-                response = self._handle_batched(request, handler)
-            elif request.prompt:
-                # Single request: process one prompt
-                response = self._handle_single(request, handler)
-            else:
-                response = LMResponse.error_response("Missing 'prompt' or 'prompts' in request.")
-
-            socket_send(self.connection, response.to_dict())
-
-        except Exception as e:
-            response = LMResponse.error_response(str(e))
-            socket_send(self.connection, response.to_dict())
-
-    def _handle_single(self, request: LMRequest, handler: "LMHandler") -> LMResponse:
-        """Handle a single prompt request."""
-        client = handler.get_client(request.model, request.depth)
-
-        start_time = time.perf_counter()
-        content = client.completion(request.prompt)
-        end_time = time.perf_counter()
-
-        usage_summary = client.get_last_usage()
-        return LMResponse.success_response(
-            chat_completion=RLMChatCompletion(
-                root_model=request.model or client.model_name,
-                prompt=request.prompt,
-                response=content,
-                usage_summary=usage_summary,
-                execution_time=end_time - start_time,
-            )
-        )
-
-    def _handle_batched(self, request: LMRequest, handler: "LMHandler") -> LMResponse:
-        """Handle a batched prompts request using async for concurrency."""
-        client = handler.get_client(request.model, request.depth)
-
-        start_time = time.perf_counter()
-
-        async def run_all():
-            tasks = [client.acompletion(prompt) for prompt in request.prompts]
-            return await asyncio.gather(*tasks)
-
-        results = asyncio.run(run_all())
-        end_time = time.perf_counter()
-
-        total_time = end_time - start_time
-        usage_summary = client.get_last_usage()
-
-        chat_completions = [
-            RLMChatCompletion(
-                root_model=request.model or client.model_name,
-                prompt=prompt,
-                response=content,
-                usage_summary=usage_summary,
-                execution_time=total_time / len(request.prompts),  # approximate per-prompt time
-            )
-            for prompt, content in zip(request.prompts, results, strict=True)
-        ]
-
-        return LMResponse.batched_success_response(chat_completions=chat_completions)
-
-
-class ThreadingLMServer(ThreadingTCPServer):
-    """Multi-threaded TCP server for LM requests."""
-
-    daemon_threads = True
-    allow_reuse_address = True
+from rlm.core.comms_utils import (
+    _HEADER,
+    WIRE_JSON,
+    Address,
+    LMRequest,
+    LMResponse,
+    decode_message,
+    encode_message,
+)
+from rlm.core.concurrency import (
+    AIMDLimiter,
+    ConcurrencyLimiter,
+    is_retryable,
+    is_throttled,
+    retry_delay,
+)
+from rlm.core.types import ModelUsageSummary, RLMChatCompletion, UsageSummary
+
+Transport = Literal["tcp", "unix"]
+
+
+def unix_sockets_supported() -> bool:
+    """Whether this platform can serve the LM Handler over a Unix domain socket."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def _last_usage(client: BaseLM) -> UsageSummary:
+    """Usage of the client's last call, keyed by model like RLMChatCompletion expects."""
+    usage = client.get_last_usage()
+    if isinstance(usage, ModelUsageSummary):
+        return UsageSummary(model_usage_summaries={client.model_name: usage})
+    return usage
+
+
+async def _read_message(reader: asyncio.StreamReader) -> tuple[Any, str] | None:
+    """Read one length-prefixed message; None if the peer closed cleanly."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ConnectionError("Connection closed before message complete") from e
+    length = _HEADER.unpack(header)[0]
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError as e:
+        raise ConnectionError("Connection closed before message complete") from e
+    return decode_message(payload)
 
 
 class LMHandler:
     """
     Handles all LM calls from the RLM main process and environment subprocesses.
 
-    Uses a multi-threaded socket server for concurrent requests.
+    Uses an asyncio socket server on a dedicated event loop thread.
     Protocol: 4-byte big-endian length prefix + JSON payload.
+
+    With transport="tcp" (default) the server listens on host:port and `address` is a
+    (host, port) tuple. With transport="unix" it listens on a Unix domain socket and
+    `address` is the socket path, which skips the TCP stack for same-host callers and
+    can be bind-mounted into a container. `socket_path` defaults to a fresh file in a
+    private temporary directory, removed again by stop().
+
+    At most `max_concurrency` LM calls run at once across all connections and
+    in-process callers; further prompts wait for a free slot. Each client is further
+    capped at `max_in_flight_per_client` concurrent calls (or its own `max_in_flight`),
+    a limit that halves when the provider throttles (HTTP 429/5xx) and creeps back up
+    as calls succeed. Transient failures are retried per prompt up to `max_retries`
+    times with exponential backoff. Clients whose SDK already retries on its own
+    (`retries_internally`, e.g. OpenAI and Anthropic) are not retried again here, so
+    throttled calls are not multiplied by both retry loops.
     """
 
     def __init__(
@@ -113,14 +107,42 @@ class LMHandler:
         host: str = "127.0.0.1",
         port: int = 0,  # auto-assign available port
         other_backend_client: BaseLM | None = None,
+        transport: Transport = "tcp",
+        socket_path: str | None = None,
+        max_concurrency: int = 64,
+        max_in_flight_per_client: int = 16,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
     ):
+        if transport not in ("tcp", "unix"):
+            raise ValueError(f"Unknown LM Handler transport: {transport!r}")
+        if transport == "unix" and not unix_sockets_supported():
+            raise ValueError("Unix domain sockets are not supported on this platform")
+        if max_in_flight_per_client < 1:
+            raise ValueError("max_in_flight_per_client must be at least 1")
+
         self.default_client = client
         self.other_backend_client = other_backend_client
         self.clients: dict[str, BaseLM] = {}
         self.host = host
-        self._server: ThreadingLMServer | None = None
-        self._thread: Thread | None = None
+        self.transport = transport
+        self.limiter = ConcurrencyLimiter(max_concurrency)
+        self.max_in_flight_per_client = max_in_flight_per_client
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self._client_limiters: dict[BaseLM, AIMDLimiter] = {}
+        self._client_limiters_lock = threading.Lock()
         self._port = port
+        self._socket_path = socket_path
+        self._socket_dir: str | None = None
+
+        # Event loop state, created on first use (start() or a direct request)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._loop_lock = threading.Lock()
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
 
         self.register_client(client.model_name, client)
 
@@ -147,35 +169,384 @@ class LMHandler:
 
     @property
     def port(self) -> int:
-        """Get the actual port (useful when auto-assigned)."""
-        if self._server:
-            return self._server.server_address[1]
+        """Get the actual port (useful when auto-assigned). Only meaningful for TCP."""
+        if self._server and self.transport == "tcp":
+            return self._server.sockets[0].getsockname()[1]
         return self._port
 
     @property
-    def address(self) -> tuple[str, int]:
-        """Get (host, port) tuple for connecting."""
+    def socket_path(self) -> str | None:
+        """Get the Unix socket path (None for the TCP transport)."""
+        return self._socket_path
+
+    @property
+    def address(self) -> Address:
+        """Get the address for connecting: (host, port) for TCP, the socket path for Unix."""
+        if self.transport == "unix":
+            return self._socket_path
         return (self.host, self.port)
 
-    def start(self) -> tuple[str, int]:
-        """Start the socket server in a background thread. Returns (host, port)."""
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the handler's event loop thread if it is not running yet."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.limiter.limit, thread_name_prefix="rlm-lm"
+                )
+                self._thread = Thread(
+                    target=self._loop.run_forever, name="rlm-lm-handler", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def start(self) -> Address:
+        """Start the socket server on the handler's event loop. Returns the address."""
         if self._server is not None:
             return self.address
 
-        self._server = ThreadingLMServer((self.host, self._port), LMRequestHandler)
-        self._server.lm_handler = self  # type: ignore
-
-        self._thread = Thread(target=self._server.serve_forever, daemon=True)
-        self._thread.start()
+        loop = self._ensure_loop()
+        if self.transport == "unix":
+            if self._socket_path is None:
+                self._socket_dir = tempfile.mkdtemp(prefix="rlm_lm_")
+                self._socket_path = os.path.join(self._socket_dir, "handler.sock")
+            elif os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)  # stale socket from a previous run
+            coro = asyncio.start_unix_server(self._serve_connection, path=self._socket_path)
+        else:
+            coro = asyncio.start_server(
+                self._serve_connection, self.host, self._port, reuse_address=True
+            )
+        self._server = asyncio.run_coroutine_threadsafe(coro, loop).result()
 
         return self.address
 
     def stop(self):
-        """Stop the socket server."""
-        if self._server:
-            self._server.shutdown()
+        """Stop the socket server and the event loop, cancelling in-flight requests."""
+        with self._loop_lock:
+            loop = self._loop
+            if loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            loop.close()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = self._thread = self._executor = None
+
+        if self.transport == "unix" and self._socket_path:
+            self._remove_socket()
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
             self._server = None
-            self._thread = None
+        for writer in list(self._connections):
+            writer.close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _remove_socket(self) -> None:
+        try:
+            os.unlink(self._socket_path)
+        except FileNotFoundError:
+            pass
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+            self._socket_path = None
+
+    # =========================================================================
+    # Socket Server
+    # =========================================================================
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read requests from one connection and answer each from its own task."""
+        tasks: set[asyncio.Task] = set()
+        write_lock = asyncio.Lock()
+        previous: asyncio.Task | None = None  # last request without an "id"
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    message = await _read_message(reader)
+                except (ValueError, TypeError) as e:
+                    error = LMResponse.error_response(f"Invalid message: {e}").to_dict()
+                    await self._send(writer, write_lock, error, WIRE_JSON)
+                    return
+                if message is None:
+                    return
+
+                request_data, wire_format = message
+                multiplexed = isinstance(request_data, dict) and "id" in request_data
+                task = asyncio.create_task(
+                    self._respond(
+                        writer,
+                        write_lock,
+                        request_data,
+                        wire_format,
+                        after=None if multiplexed else previous,
+                    )
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if not multiplexed:
+                    previous = task
+        except (ConnectionError, OSError):
+            pass
+        except asyncio.CancelledError:
+            # Handler stopping. Returning normally (this is the connection's top-level
+            # task) keeps asyncio's stream server from logging the cancellation.
+            pass
+        finally:
+            # The client is gone (or the handler is stopping): nobody is left to answer
+            self._connections.discard(writer)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+        request_data: Any,
+        wire_format: str,
+        after: asyncio.Task | None,
+    ) -> None:
+        """Process one request and send its response (tagged with the request ID)."""
+        response = (await self._process(request_data)).to_dict()
+        if after is not None:
+            # Requests without an ID are answered in the order they arrived
+            await asyncio.wait([after])
+        if isinstance(request_data, dict) and "id" in request_data:
+            response["id"] = request_data["id"]
+        await self._send(writer, write_lock, response, wire_format)
+
+    async def _send(
+        self, writer: asyncio.StreamWriter, write_lock: asyncio.Lock, data: dict, wire_format: str
+    ) -> None:
+        payload = encode_message(data, wire_format)
+        async with write_lock:
+            if writer.is_closing():
+                return  # client went away; nothing left to answer
+            try:
+                writer.writelines([_HEADER.pack(len(payload)), payload])
+                await writer.drain()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _process(self, request_data: Any) -> LMResponse:
+        if not isinstance(request_data, dict):
+            return LMResponse.error_response("Request must be a JSON object")
+        try:
+            request = LMRequest.from_dict(request_data)
+        except Exception as e:
+            return LMResponse.error_response(str(e))
+        return await self.ahandle_request(request)
+
+    # =========================================================================
+    # Request Handling
+    # =========================================================================
+
+    def handle_request(self, request: LMRequest) -> LMResponse:
+        """Serve an LM request and return its response.
+
+        This is what the socket server runs for each request; in-process callers
+        (e.g. LocalREPL) can call it directly to skip the socket and serialization.
+        Single prompts run on the calling thread, batches on the handler's event loop;
+        both count against the same concurrency limits. Must not be called from the
+        handler's own loop thread (use ahandle_request).
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("handle_request() called from the LM Handler loop")
+        if not request.is_batched:
+            try:
+                return self._handle_single(request)
+            except Exception as e:
+                return LMResponse.error_response(str(e))
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self.ahandle_request(request), loop)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            return LMResponse.error_response("LM Handler stopped")
+
+    async def ahandle_request(self, request: LMRequest) -> LMResponse:
+        """Serve an LM request on the handler's event loop."""
+        try:
+            if request.is_batched:
+                # Batched request: process multiple prompts concurrently
+                return await self._handle_batched(request)
+            # Single request: blocking client call on the thread pool
+            return await self._ahandle_single(request)
+        except Exception as e:
+            return LMResponse.error_response(str(e))
+
+    def _handle_single(self, request: LMRequest) -> LMResponse:
+        """Handle a single prompt request on the calling thread."""
+        if not request.prompt:
+            return LMResponse.error_response("Missing 'prompt' or 'prompts' in request.")
+        client = self.get_client(request.model, request.depth)
+        limiter = self._client_limiter(client)
+
+        for attempt in itertools.count():
+            try:
+                with limiter.slot(), self.limiter.slot():
+                    start_time = time.perf_counter()
+                    content = client.completion(request.prompt)
+                    end_time = time.perf_counter()
+                    usage_summary = _last_usage(client)
+            except Exception as e:
+                delay = self._retry_delay(client, limiter, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
+                limiter.on_success()
+                return self._single_response(
+                    request, client, content, usage_summary, end_time - start_time
+                )
+
+    async def _ahandle_single(self, request: LMRequest) -> LMResponse:
+        """Handle a single prompt request from the loop (client call on the thread pool)."""
+        if not request.prompt:
+            return LMResponse.error_response("Missing 'prompt' or 'prompts' in request.")
+        client = self.get_client(request.model, request.depth)
+        loop = asyncio.get_running_loop()
+
+        def call():
+            content = client.completion(request.prompt)
+            return content, _last_usage(client)
+
+        (content, usage_summary), execution_time = await self._acall(
+            client, lambda: loop.run_in_executor(self._executor, call)
+        )
+        return self._single_response(request, client, content, usage_summary, execution_time)
+
+    def _single_response(
+        self,
+        request: LMRequest,
+        client: BaseLM,
+        content: str,
+        usage_summary: UsageSummary,
+        execution_time: float,
+    ) -> LMResponse:
+        return LMResponse.success_response(
+            chat_completion=RLMChatCompletion(
+                root_model=request.model or client.model_name,
+                prompt=request.prompt,
+                response=content,
+                usage_summary=usage_summary,
+                execution_time=execution_time,
+            )
+        )
+
+    async def _handle_batched(self, request: LMRequest) -> LMResponse:
+        """Handle a batched prompts request as concurrent tasks on the handler loop.
+
+        Each prompt is limited and retried on its own; prompts that still fail are
+        reported individually while the rest of the batch succeeds. Results keep the
+        order of the prompts.
+        """
+        client = self.get_client(request.model, request.depth)
+
+        async def complete(prompt):
+            try:
+                content, execution_time = await self._acall(
+                    client, lambda: client.acompletion(prompt)
+                )
+                return content, execution_time, None
+            except Exception as e:
+                return None, None, str(e)
+
+        results = await asyncio.gather(*(complete(prompt) for prompt in request.prompts))
+        usage_summary = _last_usage(client)
+
+        chat_completions = [
+            RLMChatCompletion(
+                root_model=request.model or client.model_name,
+                prompt=prompt,
+                response=content,
+                usage_summary=usage_summary,
+                execution_time=execution_time,
+            )
+            if error is None
+            else None
+            for prompt, (content, execution_time, error) in zip(
+                request.prompts, results, strict=True
+            )
+        ]
+        errors = [error for _, _, error in results]
+
+        return LMResponse.batched_success_response(chat_completions=chat_completions, errors=errors)
+
+    # =========================================================================
+    # Limits and Retries
+    # =========================================================================
+
+    def _client_limiter(self, client: BaseLM) -> AIMDLimiter:
+        """Adaptive in-flight limiter for a client, created on first use.
+
+        Its ceiling is the client's `max_in_flight` (settable via backend_kwargs),
+        falling back to the handler's `max_in_flight_per_client`.
+        """
+        with self._client_limiters_lock:
+            limiter = self._client_limiters.get(client)
+            if limiter is None:
+                max_in_flight = getattr(client, "max_in_flight", None)
+                if not isinstance(max_in_flight, int) or max_in_flight < 1:
+                    max_in_flight = self.max_in_flight_per_client
+                limiter = AIMDLimiter(max_in_flight)
+                self._client_limiters[client] = limiter
+            return limiter
+
+    def _max_retries(self, client: BaseLM) -> int:
+        """Retries left to the handler: none when the client's SDK already retries."""
+        if getattr(client, "retries_internally", False) is True:
+            return 0
+        return self.max_retries
+
+    def _retry_delay(
+        self, client: BaseLM, limiter: AIMDLimiter, error: Exception, attempt: int
+    ) -> float | None:
+        """Record a failed call; return how long to wait before retrying, or None to give up."""
+        if is_throttled(error):
+            limiter.on_throttle()
+        if attempt >= self._max_retries(client) or not is_retryable(error):
+            return None
+        return retry_delay(error, attempt, self.retry_base_delay)
+
+    async def _acall(self, client: BaseLM, call: Callable[[], Awaitable[Any]]) -> tuple[Any, float]:
+        """Run `call` under the client and global limits, retrying transient failures.
+
+        Returns:
+            (result of call, seconds taken by the successful attempt)
+        """
+        limiter = self._client_limiter(client)
+        for attempt in itertools.count():
+            try:
+                async with limiter.aslot(), self.limiter.aslot():
+                    start_time = time.perf_counter()
+                    result = await call()
+                    end_time = time.perf_counter()
+            except Exception as e:
+                delay = self._retry_delay(client, limiter, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                limiter.on_success()
+                return result, end_time - start_time
 
     def completion(self, prompt: str, model: str | None = None) -> str:
         """Direct completion call (for main process use)."""
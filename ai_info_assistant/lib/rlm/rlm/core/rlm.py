@@ -3,7 +3,7 @@ from contextlib import contextmanager
 from typing import Any
 
 from rlm.clients import BaseLM, get_client
-from rlm.core.lm_handler import LMHandler
+from rlm.core.lm_handler import LMHandler, Transport, unix_sockets_supported
 from rlm.core.types import (
     ClientBackend,
     CodeBlock,
@@ -28,6 +28,13 @@ from rlm.utils.prompts import (
 )
 from rlm.utils.rlm_utils import filter_sensitive_keys
 
+# Environments whose LM calls reach the handler from this host (in-process or via a
+# host-side proxy), so the handler can listen on a Unix domain socket instead of TCP.
+UNIX_SOCKET_ENVIRONMENTS = ("local", "docker")
+
+# Environments that run in this process and can call the LM handler directly.
+DIRECT_DISPATCH_ENVIRONMENTS = ("local",)
+
 
 class RLM:
     """
@@ -138,7 +145,11 @@ class RLM:
         if self.other_backends and self.other_backend_kwargs:
             other_backend_client = get_client(self.other_backends[0], self.other_backend_kwargs[0])
 
-        lm_handler = LMHandler(client, other_backend_client=other_backend_client)
+        lm_handler = LMHandler(
+            client,
+            other_backend_client=other_backend_client,
+            transport=self._handler_transport(),
+        )
 
         # Register other clients to be available as sub-call options (by model name)
         if self.other_backends and self.other_backend_kwargs:
@@ -158,11 +169,15 @@ class RLM:
                     f"implement required methods (update_handler_address, add_context, get_context_count). "
                     f"This should have been caught at initialization."
                 )
-            environment.update_handler_address((lm_handler.host, lm_handler.port))
+            environment.update_handler_address(lm_handler.address)
+            if self.environment_type in DIRECT_DISPATCH_ENVIRONMENTS:
+                environment.update_handler(lm_handler)
             environment.add_context(prompt)
         else:
             env_kwargs = self.environment_kwargs.copy()
-            env_kwargs["lm_handler_address"] = (lm_handler.host, lm_handler.port)
+            env_kwargs["lm_handler_address"] = lm_handler.address
+            if self.environment_type in DIRECT_DISPATCH_ENVIRONMENTS:
+                env_kwargs["lm_handler"] = lm_handler
             env_kwargs["context_payload"] = prompt
             env_kwargs["depth"] = self.depth + 1  # Environment depth is RLM depth + 1
             environment: BaseEnv = get_environment(self.environment_type, env_kwargs)
@@ -174,9 +189,17 @@ class RLM:
             yield lm_handler, environment
         finally:
             lm_handler.stop()
+            if self.persistent and self.environment_type in DIRECT_DISPATCH_ENVIRONMENTS:
+                environment.update_handler(None)  # don't keep the stopped handler alive
             if not self.persistent and hasattr(environment, "cleanup"):
                 environment.cleanup()
 
+    def _handler_transport(self) -> Transport:
+        """Pick the LM handler transport: Unix socket for host-local environments, else TCP."""
+        if self.environment_type in UNIX_SOCKET_ENVIRONMENTS and unix_sockets_supported():
+            return "unix"
+        return "tcp"
+
     def _setup_prompt(self, prompt: str | dict[str, Any]) -> list[dict[str, Any]]:
         """
         Setup the system prompt for the RLM. Also include metadata about the prompt and build
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, Protocol, runtime_checkable
 
+from rlm.core.comms_utils import Address
 from rlm.core.types import REPLResult
 
 
@@ -105,7 +106,7 @@ class SupportsPersistence(Protocol):
         Run: uv run pytest tests/test_local_repl_persistent.py -v
     """
 
-    def update_handler_address(self, address: tuple[str, int]) -> None:
+    def update_handler_address(self, address: Address) -> None:
         """Update the LM handler address for nested LLM calls.
 
         Called by RLM when the handler address changes between completions.
@@ -113,7 +114,7 @@ class SupportsPersistence(Protocol):
         the LM handler.
 
         Args:
-            address: (host, port) tuple for the LM handler server.
+            address: (host, port) tuple or Unix socket path for the LM handler server.
         """
         ...
 
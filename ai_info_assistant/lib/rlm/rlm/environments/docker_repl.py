@@ -17,7 +17,7 @@ import threading
 import time
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
-from rlm.core.comms_utils import LMRequest, send_lm_request, send_lm_request_batched
+from rlm.core.comms_utils import Address, LMRequest, send_lm_request, send_lm_request_batched
 from rlm.core.types import REPLResult, RLMChatCompletion
 from rlm.environments.base_env import NonIsolatedEnv
 
@@ -25,7 +25,7 @@ from rlm.environments.base_env import NonIsolatedEnv
 class LLMProxyHandler(BaseHTTPRequestHandler):
     """HTTP handler for LLM requests from the container."""
 
-    lm_handler_address: tuple[str, int] | None = None
+    lm_handler_address: Address | None = None
     pending_calls: list[RLMChatCompletion] = []
     lock: threading.Lock = threading.Lock()
     depth: int = 1
@@ -178,7 +178,7 @@ class DockerREPL(NonIsolatedEnv):
     def __init__(
         self,
         image: str = "python:3.11-slim",
-        lm_handler_address: tuple[str, int] | None = None,
+        lm_handler_address: Address | None = None,
         context_payload: dict | list | str | None = None,
         setup_code: str | None = None,
         persistent: bool = False,
@@ -9,12 +9,21 @@ import threading
 import time
 import uuid
 from contextlib import contextmanager
-from typing import Any
-
-from rlm.core.comms_utils import LMRequest, send_lm_request, send_lm_request_batched
+from typing import TYPE_CHECKING, Any
+
+from rlm.core.comms_utils import (
+    Address,
+    LMRequest,
+    LMResponse,
+    send_lm_request,
+    send_lm_request_batched,
+)
 from rlm.core.types import REPLResult, RLMChatCompletion
 from rlm.environments.base_env import NonIsolatedEnv
 
+if TYPE_CHECKING:
+    from rlm.core.lm_handler import LMHandler
+
 # =============================================================================
 # Safe Builtins
 # =============================================================================
@@ -116,20 +125,26 @@ class LocalREPL(NonIsolatedEnv):
     """
     Local REPL environment with persistent Python namespace.
     Executes code in a sandboxed namespace with access to context data.
+
+    If given an `lm_handler` living in the same process, llm_query() calls dispatch to
+    it directly instead of going through its socket, so sub-calls cost no
+    serialization or I/O. Otherwise calls go to `lm_handler_address`.
     """
 
     def __init__(
         self,
-        lm_handler_address: tuple[str, int] | None = None,
+        lm_handler_address: Address | None = None,
         context_payload: dict | list | str | None = None,
         setup_code: str | None = None,
         persistent: bool = False,
         depth: int = 1,
+        lm_handler: "LMHandler | None" = None,
         **kwargs,
     ):
         super().__init__(persistent=persistent, depth=depth, **kwargs)
 
         self.lm_handler_address = lm_handler_address
+        self.lm_handler = lm_handler
         self.original_cwd = os.getcwd()
         self.temp_dir = tempfile.mkdtemp(prefix=f"repl_env_{uuid.uuid4()}_")
         self._lock = threading.Lock()
@@ -171,19 +186,25 @@ class LocalREPL(NonIsolatedEnv):
             return str(self.locals[variable_name])
         return f"Error: Variable '{variable_name}' not found"
 
+    def _send_request(self, request: LMRequest) -> LMResponse:
+        """Dispatch to the in-process handler if there is one, else over the socket."""
+        if self.lm_handler is not None:
+            return self.lm_handler.handle_request(request)
+        return send_lm_request(self.lm_handler_address, request)
+
     def _llm_query(self, prompt: str, model: str | None = None) -> str:
-        """Query the LM via socket connection to the handler.
+        """Query the LM via the handler (in-process or socket connection).
 
         Args:
             prompt: The prompt to send to the LM.
             model: Optional model name to use (if handler has multiple clients).
         """
-        if not self.lm_handler_address:
+        if not self.lm_handler and not self.lm_handler_address:
             return "Error: No LM handler configured"
 
         try:
             request = LMRequest(prompt=prompt, model=model, depth=self.depth)
-            response = send_lm_request(self.lm_handler_address, request)
+            response = self._send_request(request)
 
             if not response.success:
                 return f"Error: {response.error}"
@@ -207,13 +228,16 @@ class LocalREPL(NonIsolatedEnv):
         Returns:
             List of responses in the same order as input prompts.
         """
-        if not self.lm_handler_address:
+        if not self.lm_handler and not self.lm_handler_address:
             return ["Error: No LM handler configured"] * len(prompts)
 
         try:
-            responses = send_lm_request_batched(
-                self.lm_handler_address, prompts, model=model, depth=self.depth
-            )
+            if self.lm_handler is not None:
+                responses = self._direct_batched(prompts, model)
+            else:
+                responses = send_lm_request_batched(
+                    self.lm_handler_address, prompts, model=model, depth=self.depth
+                )
 
             results = []
             for response in responses:
@@ -228,6 +252,11 @@ class LocalREPL(NonIsolatedEnv):
         except Exception as e:
             return [f"Error: LM query failed - {e}"] * len(prompts)
 
+    def _direct_batched(self, prompts: list[str], model: str | None) -> list[LMResponse]:
+        """Batched request against the in-process handler, split into per-prompt responses."""
+        request = LMRequest(prompts=prompts, model=model, depth=self.depth)
+        return self.lm_handler.handle_request(request).unbatch(len(prompts))
+
     def load_context(self, context_payload: dict | list | str):
         """Load context into the environment as context_0 (and 'context' alias)."""
         self.add_context(context_payload, 0)
@@ -270,10 +299,14 @@ class LocalREPL(NonIsolatedEnv):
         self._context_count = max(self._context_count, context_index + 1)
         return context_index
 
-    def update_handler_address(self, address: tuple[str, int]) -> None:
+    def update_handler_address(self, address: Address) -> None:
         """Update the LM handler address for a new completion call."""
         self.lm_handler_address = address
 
+    def update_handler(self, lm_handler: "LMHandler | None") -> None:
+        """Set (or clear) the in-process LM handler used for direct dispatch."""
+        self.lm_handler = lm_handler
+
     def get_context_count(self) -> int:
         """Return the number of contexts loaded."""
         return self._context_count
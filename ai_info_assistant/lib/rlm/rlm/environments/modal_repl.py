@@ -7,7 +7,7 @@ import time
 import modal
 import requests
 
-from rlm.core.comms_utils import LMRequest, send_lm_request, send_lm_request_batched
+from rlm.core.comms_utils import Address, LMRequest, send_lm_request, send_lm_request_batched
 from rlm.core.types import REPLResult, RLMChatCompletion
 from rlm.environments.base_env import IsolatedEnv
 from rlm.environments.constants import APT_PACKAGES, PIP_PACKAGES
@@ -280,7 +280,7 @@ class ModalREPL(IsolatedEnv):
         app_name: str = "rlm-sandbox",
         image: modal.Image | None = None,
         timeout: int = 600,
-        lm_handler_address: tuple[str, int] | None = None,
+        lm_handler_address: Address | None = None,
         context_payload: dict | list | str | None = None,
         setup_code: str | None = None,
         persistent: bool = False,
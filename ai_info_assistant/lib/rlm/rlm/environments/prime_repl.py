@@ -21,7 +21,7 @@ from prime_sandboxes import (
     SandboxClient,
 )
 
-from rlm.core.comms_utils import LMRequest, send_lm_request, send_lm_request_batched
+from rlm.core.comms_utils import Address, LMRequest, send_lm_request, send_lm_request_batched
 from rlm.core.types import REPLResult, RLMChatCompletion
 from rlm.environments.base_env import IsolatedEnv
 from rlm.environments.constants import APT_PACKAGES, PIP_PACKAGES
@@ -279,7 +279,7 @@ class PrimeREPL(IsolatedEnv):
         name: str = "rlm-sandbox",
         docker_image: str = "python:3.11-slim",
         timeout_minutes: int = 60,
-        lm_handler_address: tuple[str, int] | None = None,
+        lm_handler_address: Address | None = None,
         context_payload: dict | list | str | None = None,
         setup_code: str | None = None,
         network_access: bool = True,
@@ -0,0 +1,279 @@
+"""Tests for the LM Handler socket protocol and persistent connections."""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from rlm.core import comms_utils
+from rlm.core.comms_utils import (
+    WIRE_JSON,
+    WIRE_MSGPACK,
+    LMConnection,
+    LMRequest,
+    LMResponse,
+    RequestNotSentError,
+    close_connections,
+    get_connection,
+    lm_request,
+    recv_message,
+    send_lm_request,
+    send_lm_request_batched,
+    socket_recv,
+    socket_request,
+    socket_send,
+)
+from rlm.core.lm_handler import LMHandler, unix_sockets_supported
+from rlm.core.rlm import RLM
+from rlm.core.types import RLMChatCompletion, UsageSummary
+from tests.mock_lm import MockLM
+
+
+class SlowMockLM(MockLM):
+    """Mock LM whose latency depends on the prompt, to force out-of-order replies."""
+
+    def completion(self, prompt):
+        if prompt.startswith("slow"):
+            time.sleep(0.3)
+        return f"Mock response to: {prompt}"
+
+
+@pytest.fixture
+def handler():
+    with LMHandler(client=MockLM()) as h:
+        yield h
+    close_connections()
+
+
+class TestFraming:
+    """Tests for length-prefixed framing."""
+
+    def test_json_roundtrip(self):
+        a, b = socket.socketpair()
+        with a, b:
+            socket_send(a, {"prompt": "hello", "depth": 1})
+            assert recv_message(b) == ({"prompt": "hello", "depth": 1}, WIRE_JSON)
+
+    def test_large_payload_roundtrip(self):
+        """Payloads above the zero-copy threshold arrive intact."""
+        prompt = "x" * (3 * 1024 * 1024)
+        a, b = socket.socketpair()
+        with a, b:
+            sender = threading.Thread(target=socket_send, args=(a, {"prompt": prompt}))
+            sender.start()
+            assert socket_recv(b) == {"prompt": prompt}
+            sender.join()
+
+    def test_closed_connection_returns_empty(self):
+        a, b = socket.socketpair()
+        a.close()
+        with b:
+            assert socket_recv(b) == {}
+            assert recv_message(b) is None
+
+    def test_truncated_message_raises(self):
+        a, b = socket.socketpair()
+        with b:
+            a.sendall(b"\x00\x00\x00\x10{")
+            a.close()
+            with pytest.raises(ConnectionError):
+                socket_recv(b)
+
+    def test_msgpack_roundtrip(self):
+        pytest.importorskip("msgpack")
+        a, b = socket.socketpair()
+        with a, b:
+            socket_send(a, {"prompt": "héllo", "prompts": ["a", "b"]}, WIRE_MSGPACK)
+            data, wire_format = recv_message(b)
+            assert wire_format == WIRE_MSGPACK
+            assert data == {"prompt": "héllo", "prompts": ["a", "b"]}
+
+    def test_default_wire_format_respects_env(self, monkeypatch):
+        monkeypatch.setenv("RLM_WIRE_FORMAT", "json")
+        assert comms_utils.default_wire_format() == WIRE_JSON
+        monkeypatch.setattr(comms_utils, "msgpack", None)
+        monkeypatch.setenv("RLM_WIRE_FORMAT", "msgpack")
+        assert comms_utils.default_wire_format() == WIRE_JSON
+
+
+class TestBatchedResponse:
+    """Tests for batched responses with per-prompt errors."""
+
+    def test_partial_failure_roundtrip(self):
+        completion = RLMChatCompletion(
+            root_model="m",
+            prompt="a",
+            response="A",
+            usage_summary=UsageSummary(model_usage_summaries={}),
+            execution_time=0.1,
+        )
+        response = LMResponse.batched_success_response([completion, None], [None, "boom"])
+        parts = LMResponse.from_dict(response.to_dict()).unbatch(2)
+
+        assert parts[0].chat_completion.response == "A"
+        assert parts[1].error == "boom"
+
+    def test_all_succeeded_drops_errors(self):
+        response = LMResponse.batched_success_response([], [None])
+        assert response.errors is None
+
+
+class TestPersistentConnection:
+    """Tests for multiplexed connections to a running LMHandler."""
+
+    def test_connection_is_reused(self, handler):
+        first = send_lm_request(handler.address, LMRequest(prompt="one"))
+        connection = get_connection(handler.address)
+        second = send_lm_request(handler.address, LMRequest(prompt="two"))
+
+        assert first.success and second.success
+        assert second.chat_completion.response == "Mock response to: two"
+        assert get_connection(handler.address) is connection
+
+    def test_batched_request(self, handler):
+        responses = send_lm_request_batched(handler.address, ["a", "b", "c"])
+        assert [r.chat_completion.response for r in responses] == [
+            "Mock response to: a",
+            "Mock response to: b",
+            "Mock response to: c",
+        ]
+
+    def test_legacy_one_shot_request(self, handler):
+        """Clients that omit the request ID still get exactly one response."""
+        data = socket_request(handler.address, {"prompt": "legacy", "depth": 0})
+        assert data["chat_completion"]["response"] == "Mock response to: legacy"
+        assert "id" not in data
+
+    @pytest.mark.parametrize("wire_format", [WIRE_JSON, WIRE_MSGPACK])
+    def test_concurrent_requests_are_routed_by_id(self, wire_format):
+        if wire_format == WIRE_MSGPACK:
+            pytest.importorskip("msgpack")
+
+        with LMHandler(client=SlowMockLM()) as h:
+            connection = LMConnection(h.address, wire_format=wire_format)
+            results = {}
+
+            def call(prompt):
+                results[prompt] = connection.request({"prompt": prompt, "depth": 0})
+
+            threads = [threading.Thread(target=call, args=(p,)) for p in ["slow", "fast1", "fast2"]]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            connection.close()
+
+        for prompt, data in results.items():
+            assert data["chat_completion"]["response"] == f"Mock response to: {prompt}"
+        # Requests ran concurrently on the one connection
+        assert elapsed < 0.6
+
+    def test_stop_closes_pooled_connections(self):
+        h = LMHandler(client=MockLM())
+        h.start()
+        assert send_lm_request(h.address, LMRequest(prompt="hi")).success
+        connection = get_connection(h.address)
+        h.stop()
+
+        deadline = time.time() + 2
+        while not connection.closed and time.time() < deadline:
+            time.sleep(0.01)
+        assert connection.closed
+
+        response = send_lm_request(h.address, LMRequest(prompt="hi"))
+        assert not response.success
+
+    def test_unsent_request_is_retried(self, handler, monkeypatch):
+        stale = get_connection(handler.address)
+        stale.close()
+        with pytest.raises(RequestNotSentError):
+            stale.request({"prompt": "x", "depth": 0})
+
+        # The pool hands out the stale connection once (a close racing the lookup)
+        connections = iter([stale])
+        real_get_connection = comms_utils.get_connection
+        monkeypatch.setattr(
+            comms_utils,
+            "get_connection",
+            lambda address: next(connections, None) or real_get_connection(address),
+        )
+        data = lm_request(handler.address, {"prompt": "retried", "depth": 0})
+        assert data["chat_completion"]["response"] == "Mock response to: retried"
+
+    def test_request_lost_after_send_is_not_retried(self):
+        """A handler that drops the connection after reading must not see the call twice."""
+        server = socket.create_server(("127.0.0.1", 0))
+        received = []
+
+        def serve():
+            for _ in range(2):
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    return
+                with conn:
+                    received.append(socket_recv(conn))
+
+        threading.Thread(target=serve, daemon=True).start()
+        try:
+            with pytest.raises(ConnectionError) as excinfo:
+                lm_request(server.getsockname(), {"prompt": "billed", "depth": 0}, timeout=5)
+        finally:
+            server.close()
+            close_connections()
+
+        assert not isinstance(excinfo.value, RequestNotSentError)
+        assert len(received) == 1
+
+
+@pytest.mark.skipif(not unix_sockets_supported(), reason="Unix domain sockets unavailable")
+class TestUnixSocketTransport:
+    """Tests for serving the LM Handler over a Unix domain socket."""
+
+    def test_address_is_socket_path(self):
+        with LMHandler(client=MockLM(), transport="unix") as h:
+            assert isinstance(h.address, str)
+            assert os.path.exists(h.address)
+            response = send_lm_request(h.address, LMRequest(prompt="hello"))
+            path = h.address
+
+        assert response.chat_completion.response == "Mock response to: hello"
+        assert not os.path.exists(path)
+        close_connections()
+
+    def test_batched_and_one_shot_requests(self):
+        with LMHandler(client=MockLM(), transport="unix") as h:
+            responses = send_lm_request_batched(h.address, ["a", "b"])
+            data = socket_request(h.address, {"prompt": "legacy", "depth": 0})
+        close_connections()
+
+        assert [r.chat_completion.response for r in responses] == [
+            "Mock response to: a",
+            "Mock response to: b",
+        ]
+        assert data["chat_completion"]["response"] == "Mock response to: legacy"
+
+    def test_explicit_socket_path_replaces_stale_file(self, tmp_path):
+        path = str(tmp_path / "lm.sock")
+        open(path, "w").close()
+        with LMHandler(client=MockLM(), transport="unix", socket_path=path) as h:
+            assert h.address == path
+            assert send_lm_request(path, LMRequest(prompt="hi")).success
+        close_connections()
+        assert not os.path.exists(path)
+
+    def test_unknown_transport_rejected(self):
+        with pytest.raises(ValueError):
+            LMHandler(client=MockLM(), transport="udp")
+
+    @pytest.mark.parametrize(
+        "environment,expected",
+        [("local", "unix"), ("docker", "unix"), ("modal", "tcp"), ("prime", "tcp")],
+    )
+    def test_rlm_selects_transport_by_environment(self, environment, expected):
+        rlm = RLM(backend="openai", backend_kwargs={"model_name": "test"}, environment=environment)
+        assert rlm._handler_transport() == expected
@@ -0,0 +1,198 @@
+"""Tests for concurrency limiting (thread/async and AIMD) and the retry policy."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rlm.core.concurrency import (
+    AIMDLimiter,
+    ConcurrencyLimiter,
+    is_retryable,
+    is_throttled,
+    retry_delay,
+    status_code_of,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(status_code)
+        self.response = FakeResponse(status_code, headers)
+
+
+class TestConcurrencyLimiter:
+    def test_threads_and_tasks_share_slots(self):
+        limiter = ConcurrencyLimiter(2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def enter():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+
+        def leave():
+            nonlocal active
+            with lock:
+                active -= 1
+
+        def thread_worker():
+            with limiter.slot():
+                enter()
+                time.sleep(0.02)
+                leave()
+
+        async def task_worker():
+            async with limiter.aslot():
+                enter()
+                await asyncio.sleep(0.02)
+                leave()
+
+        async def run_tasks():
+            await asyncio.gather(*(task_worker() for _ in range(5)))
+
+        threads = [threading.Thread(target=thread_worker) for _ in range(5)]
+        threads.append(threading.Thread(target=asyncio.run, args=(run_tasks(),)))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak == 2
+        assert limiter.in_use == 0
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        limiter = ConcurrencyLimiter(1)
+
+        async def scenario():
+            await limiter.acquire_async()
+            waiter = asyncio.create_task(limiter.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            limiter.release()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            # The slot is free again for the next caller
+            await asyncio.wait_for(limiter.acquire_async(), 1)
+            limiter.release()
+
+        asyncio.run(scenario())
+        assert limiter.in_use == 0
+
+    def test_waiters_are_served_in_order(self):
+        limiter = ConcurrencyLimiter(1)
+        order = []
+
+        async def worker(i):
+            async with limiter.aslot():
+                order.append(i)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            async with limiter.aslot():
+                tasks = [asyncio.create_task(worker(i)) for i in range(5)]
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        assert order == [0, 1, 2, 3, 4]
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(0)
+
+
+class TestAIMDLimiter:
+    def test_throttle_halves_limit_once_per_cooldown(self):
+        limiter = AIMDLimiter(16, cooldown=60)
+        limiter.on_throttle()
+        limiter.on_throttle()
+        assert limiter.limit == 8
+
+    def test_limit_never_drops_below_minimum(self):
+        limiter = AIMDLimiter(4, min_limit=2, cooldown=0)
+        for _ in range(5):
+            limiter.on_throttle()
+        assert limiter.limit == 2
+
+    def test_success_grows_limit_additively(self):
+        limiter = AIMDLimiter(8, cooldown=0)
+        limiter.on_throttle()
+        assert limiter.limit == 4
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.limit == 5
+        for _ in range(100):
+            limiter.on_success()
+        assert limiter.limit == 8
+
+    def test_lowered_limit_applies_as_slots_free(self):
+        limiter = AIMDLimiter(2, cooldown=0)
+        limiter.acquire()
+        limiter.acquire()
+        limiter.on_throttle()
+        assert limiter.limit == 1
+
+        acquired = threading.Event()
+
+        def waiter():
+            limiter.acquire()
+            acquired.set()
+
+        threading.Thread(target=waiter, daemon=True).start()
+        limiter.release()  # still one call in flight: at the new limit
+        assert not acquired.wait(0.05)
+        limiter.release()
+        assert acquired.wait(1)
+
+
+class TestRetryPolicy:
+    def test_status_code_shapes(self):
+        error = Exception()
+        error.status_code = 429
+        assert status_code_of(error) == 429
+        assert status_code_of(FakeHTTPError(502)) == 502
+        google_style = Exception()
+        google_style.code = 503
+        assert status_code_of(google_style) == 503
+        assert status_code_of(ValueError("x")) is None
+
+    def test_classification(self):
+        assert is_throttled(FakeHTTPError(429)) and is_retryable(FakeHTTPError(429))
+        assert is_throttled(FakeHTTPError(500))
+        assert not is_throttled(FakeHTTPError(400)) and not is_retryable(FakeHTTPError(400))
+        assert is_retryable(TimeoutError()) and not is_throttled(TimeoutError())
+
+    def test_sdk_network_errors_are_retryable(self):
+        # openai/anthropic network errors subclass neither TimeoutError nor ConnectionError
+        class APIError(Exception):
+            pass
+
+        class APIConnectionError(APIError):
+            pass
+
+        class APITimeoutError(APIConnectionError):
+            pass
+
+        assert is_retryable(APIConnectionError()) and is_retryable(APITimeoutError())
+        assert not is_throttled(APITimeoutError())
+        assert not is_retryable(APIError())
+
+    def test_retry_after_header_is_honoured(self):
+        assert retry_delay(FakeHTTPError(429, {"retry-after": "2"}), 0, base=0.5) == 2.0
+
+    def test_exponential_backoff(self):
+        for attempt in range(4):
+            delay = retry_delay(ValueError(), attempt, base=1.0)
+            assert 0.5 * 2**attempt <= delay <= 2**attempt
+        assert retry_delay(ValueError(), 20, base=1.0, cap=5) <= 5
@@ -0,0 +1,236 @@
+"""Tests for the asyncio-based LMHandler."""
+
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from rlm.core.comms_utils import (
+    LMRequest,
+    close_connections,
+    send_lm_request_batched,
+    socket_send,
+)
+from rlm.core.lm_handler import LMHandler
+from tests.mock_lm import MockLM
+
+
+class TrackingLM(MockLM):
+    """Mock LM recording the event loops and peak concurrency of async calls."""
+
+    def __init__(self, delay: float = 0.01):
+        super().__init__()
+        self.delay = delay
+        self.loops: set[int] = set()
+        self.active = 0
+        self.peak = 0
+        self.cancelled = threading.Event()
+
+    async def acompletion(self, prompt):
+        self.loops.add(id(asyncio.get_running_loop()))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        finally:
+            self.active -= 1
+        return self.completion(prompt)
+
+
+class FailingLM(MockLM):
+    async def acompletion(self, prompt):
+        if prompt == "bad":
+            raise RuntimeError("upstream error")
+        return self.completion(prompt)
+
+
+class StatusError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyLM(MockLM):
+    """Mock LM that fails each prompt `failures` times with `status` before succeeding."""
+
+    def __init__(self, status: int = 429, failures: int = 1):
+        super().__init__()
+        self.status = status
+        self.failures = failures
+        self.calls: dict[str, int] = {}
+
+    def completion(self, prompt):
+        self.calls[prompt] = self.calls.get(prompt, 0) + 1
+        if self.calls[prompt] <= self.failures:
+            raise StatusError(self.status)
+        return super().completion(prompt)
+
+    async def acompletion(self, prompt):
+        return self.completion(prompt)
+
+
+class TestEventLoop:
+    """Tests for batches running on the handler's persistent loop."""
+
+    def test_batches_share_one_loop(self):
+        client = TrackingLM()
+        with LMHandler(client=client) as h:
+            send_lm_request_batched(h.address, ["a", "b"])
+            send_lm_request_batched(h.address, ["c", "d"])
+        close_connections()
+        assert len(client.loops) == 1
+
+    def test_concurrency_limit_and_order(self):
+        client = TrackingLM()
+        prompts = [f"p{i}" for i in range(20)]
+        with LMHandler(client=client, max_concurrency=3) as h:
+            responses = send_lm_request_batched(h.address, prompts)
+        close_connections()
+
+        assert client.peak == 3
+        assert [r.chat_completion.response for r in responses] == [
+            f"Mock response to: {p}" for p in prompts
+        ]
+
+    def test_failed_prompt_is_reported_individually(self):
+        with LMHandler(client=FailingLM()) as h:
+            responses = send_lm_request_batched(h.address, ["ok", "bad", "fine"])
+        close_connections()
+
+        assert responses[0].chat_completion.response == "Mock response to: ok"
+        assert responses[1].error == "upstream error"
+        assert responses[2].chat_completion.response == "Mock response to: fine"
+
+    def test_direct_request_from_running_loop(self):
+        handler = LMHandler(client=MockLM())
+
+        async def caller():
+            return handler.handle_request(LMRequest(prompts=["x", "y"]))
+
+        response = asyncio.run(caller())
+        handler.stop()
+        assert [c.response for c in response.chat_completions] == [
+            "Mock response to: x",
+            "Mock response to: y",
+        ]
+
+
+class TestLimitsAndRetries:
+    """Tests for per-client limits, adaptive backoff and per-prompt retries."""
+
+    def test_throttled_prompts_are_retried(self):
+        client = FlakyLM(status=429, failures=2)
+        prompts = [f"p{i}" for i in range(10)]
+        with LMHandler(client=client, retry_base_delay=0.001) as h:
+            responses = send_lm_request_batched(h.address, prompts)
+            limiter = h._client_limiter(client)
+        close_connections()
+
+        assert [r.chat_completion.response for r in responses] == [
+            f"Mock response to: {p}" for p in prompts
+        ]
+        assert all(count == 3 for count in client.calls.values())
+        # The burst of 429s halved the limit once (cooldown), then 8 successes added one
+        assert limiter.limit == 9
+
+    def test_retries_are_bounded(self):
+        client = FlakyLM(status=503, failures=10)
+        handler = LMHandler(client=client, max_retries=2, retry_base_delay=0.001)
+        response = handler.handle_request(LMRequest(prompts=["a"]))
+        handler.stop()
+
+        assert response.errors == ["HTTP 503"]
+        assert client.calls["a"] == 3
+
+    def test_client_errors_are_not_retried(self):
+        client = FlakyLM(status=400, failures=1)
+        handler = LMHandler(client=client, retry_base_delay=0.001)
+        response = handler.handle_request(LMRequest(prompt="a"))
+        handler.stop()
+
+        assert response.error == "HTTP 400"
+        assert client.calls["a"] == 1
+
+    def test_direct_single_prompt_is_retried(self):
+        client = FlakyLM(status=500, failures=1)
+        handler = LMHandler(client=client, retry_base_delay=0.001)
+        response = handler.handle_request(LMRequest(prompt="a"))
+
+        assert response.chat_completion.response == "Mock response to: a"
+        assert client.calls["a"] == 2
+
+    def test_clients_retrying_internally_are_not_retried_again(self):
+        client = FlakyLM(status=429, failures=1)
+        client.retries_internally = True
+        handler = LMHandler(client=client, retry_base_delay=0.001)
+        response = handler.handle_request(LMRequest(prompt="a"))
+        limiter = handler._client_limiter(client)
+        handler.stop()
+
+        assert response.error == "HTTP 429"
+        assert client.calls["a"] == 1
+        assert limiter.limit < handler.max_in_flight_per_client
+
+    def test_per_client_max_in_flight(self):
+        client = TrackingLM()
+        client.max_in_flight = 2
+        handler = LMHandler(client=client, max_concurrency=10)
+        response = handler.handle_request(LMRequest(prompts=[str(i) for i in range(10)]))
+        handler.stop()
+
+        assert len(response.chat_completions) == 10
+        assert client.peak == 2
+
+    def test_handler_default_max_in_flight(self):
+        client = TrackingLM()
+        handler = LMHandler(client=client, max_in_flight_per_client=4)
+        handler.handle_request(LMRequest(prompts=[str(i) for i in range(12)]))
+        handler.stop()
+        assert client.peak == 4
+
+
+class TestCancellation:
+    """Tests for abandoning work whose requester has gone away."""
+
+    def test_disconnect_cancels_batch(self):
+        client = TrackingLM(delay=30)
+        with LMHandler(client=client) as h:
+            sock = socket.create_connection(h.address)
+            socket_send(sock, {"prompts": ["a", "b"], "depth": 0, "id": 1})
+            deadline = time.time() + 5
+            while client.active < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            sock.close()
+
+            assert client.cancelled.wait(5)
+            deadline = time.time() + 5
+            while client.active and time.time() < deadline:
+                time.sleep(0.01)
+            assert client.active == 0
+
+    def test_stop_cancels_direct_requests(self):
+        handler = LMHandler(client=TrackingLM(delay=30))
+        result = {}
+        caller = threading.Thread(
+            target=lambda: result.setdefault(
+                "response", handler.handle_request(LMRequest(prompts=["a"]))
+            )
+        )
+        caller.start()
+        time.sleep(0.1)
+        handler.stop()
+        caller.join(5)
+
+        assert not caller.is_alive()
+        assert result["response"].error == "LM Handler stopped"
+
+    def test_invalid_concurrency_rejected(self):
+        with pytest.raises(ValueError):
+            LMHandler(client=MockLM(), max_concurrency=0)
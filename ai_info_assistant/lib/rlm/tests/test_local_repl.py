@@ -2,7 +2,11 @@
 
 import os
 
+from rlm.core.comms_utils import close_connections
+from rlm.core.lm_handler import LMHandler
+from rlm.core.types import ModelUsageSummary
 from rlm.environments.local_repl import LocalREPL
+from tests.mock_lm import MockLM
 
 
 class TestLocalREPLBasic:
@@ -243,3 +247,60 @@ class TestLocalREPLSimulatingRLMNoPersistence:
         assert "NameError" in result.stderr
         assert "my_helper" in result.stderr
         completion_2_env.cleanup()
+
+
+class CountingLM(MockLM):
+    """Mock LM reporting per-call usage the way the real clients do."""
+
+    def get_last_usage(self):
+        return ModelUsageSummary(total_calls=1, total_input_tokens=7, total_output_tokens=3)
+
+
+class TestLocalREPLDirectDispatch:
+    """Tests for llm_query dispatching to an in-process LMHandler."""
+
+    def test_llm_query_without_socket(self):
+        """A handler that was never started still serves direct calls."""
+        handler = LMHandler(client=MockLM())
+        repl = LocalREPL(lm_handler=handler)
+        result = repl.execute_code("answer = llm_query('hello')")
+
+        assert result.stderr == ""
+        assert repl.locals["answer"] == "Mock response to: hello"
+        assert [c.response for c in result.rlm_calls] == ["Mock response to: hello"]
+        repl.cleanup()
+
+    def test_llm_query_batched(self):
+        repl = LocalREPL(lm_handler=LMHandler(client=MockLM()))
+        result = repl.execute_code("answers = llm_query_batched(['a', 'b'])")
+
+        assert repl.locals["answers"] == ["Mock response to: a", "Mock response to: b"]
+        assert len(result.rlm_calls) == 2
+        repl.cleanup()
+
+    def test_direct_and_socket_calls_record_same_usage(self):
+        code = "single = llm_query('q')\nbatch = llm_query_batched(['x', 'y'])"
+        with LMHandler(client=CountingLM()) as handler:
+            direct_repl = LocalREPL(lm_handler=handler)
+            socket_repl = LocalREPL(lm_handler_address=handler.address)
+            direct = direct_repl.execute_code(code).rlm_calls
+            via_socket = socket_repl.execute_code(code).rlm_calls
+        close_connections()
+
+        assert len(direct) == len(via_socket) == 3
+        for a, b in zip(direct, via_socket, strict=True):
+            assert (a.root_model, a.prompt, a.response) == (b.root_model, b.prompt, b.response)
+            assert a.usage_summary.to_dict() == b.usage_summary.to_dict()
+        assert direct[0].usage_summary.model_usage_summaries["mock-model"].total_input_tokens == 7
+        direct_repl.cleanup()
+        socket_repl.cleanup()
+
+    def test_depth_routing_is_preserved(self):
+        other = MockLM()
+        other.model_name = "other-model"
+        handler = LMHandler(client=MockLM(), other_backend_client=other)
+        repl = LocalREPL(lm_handler=handler, depth=1)
+        result = repl.execute_code("llm_query('hi')")
+
+        assert result.rlm_calls[0].root_model == "other-model"
+        repl.cleanup()
@@ -20,9 +20,11 @@ load_dotenv()
 
 from src.crawler.finance_crawler import FinancialCrawler
 from src.analyzer.sentiment_engine import MarketSentimentAnalyzer
+from src.analyzer.llm_cache import get_llm_cache
 from src.database.storage import DatabaseManager
 from src.models import SourceConfig
 from src.config import config
+from src.http_client import close_http_clients
 
 async def run_pipeline():
     """執行財經新聞分析流程"""
@@ -38,28 +40,43 @@ async def run_pipeline():
     raw_articles = await crawler.fetch()
     if not raw_articles:
         logger.info("⚠️ 無新新聞")
+        crawler.commit_validators()
         return
 
     # 2. 過濾已存在的
     db = DatabaseManager()
-    processed_ids = db.get_processed_ids()
+    processed_ids = db.get_existing_ids(a.id for a in raw_articles)
     new_articles = [a for a in raw_articles if a.id not in processed_ids]
     
     logger.info(f"📥 抓取 {len(raw_articles)} -> 新增 {len(new_articles)}")
     
     if not new_articles:
+        crawler.commit_validators()
         return
 
     # 3. AI 情緒分析
     analyzer = MarketSentimentAnalyzer()
     analyzed_articles = await analyzer.batch_analyze(new_articles)
     
-    # 4. 存檔
+    # 4. 存檔 (寫入後才保存 Feed 驗證器，分析或寫入失敗時下一輪會完整重抓)
     db.save_articles(analyzed_articles)
+    crawler.commit_validators()
+    
+    llm_cache = get_llm_cache()
+    if llm_cache:
+        llm_cache.log_stats()
     
     elapsed = (datetime.now() - start_time).total_seconds()
     logger.success(f"🎉 流程完成！分析了 {len(analyzed_articles)} 篇財經新聞，耗時 {elapsed:.1f}s")
 
 
+async def main():
+    """執行一次流程，結束後釋放共享連線池"""
+    try:
+        await run_pipeline()
+    finally:
+        await close_http_clients()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_pipeline())
+    asyncio.run(main())
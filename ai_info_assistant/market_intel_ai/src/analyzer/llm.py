@@ -1,11 +1,33 @@
 import os
-import httpx
-from typing import Dict, Any, Optional
+import asyncio
+from typing import Dict, Any, Callable, Optional
 from loguru import logger
 from dotenv import load_dotenv
+from ..config import config
+from ..http_client import get_http_client
+from .rate_limit import TokenBucket, parse_retry_after
+from .llm_cache import LLMResponseCache, get_llm_cache
 
 load_dotenv()
 
+# 閘道節流時可重試的狀態碼
+THROTTLE_STATUS = {429, 503}
+
+# 行程內共用的閘道限流器 (綁定於目前的事件迴圈)
+_gateway_limiter: Optional[TokenBucket] = None
+_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_gateway_limiter() -> TokenBucket:
+    """取得共用的 LLM 閘道限流器"""
+    global _gateway_limiter, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _gateway_limiter is None or _limiter_loop is not loop:
+        _gateway_limiter = TokenBucket(config.llm_rate_per_sec, config.llm_burst)
+        _limiter_loop = loop
+    return _gateway_limiter
+
+
 class LLMClient:
     """處理對 Antigravity API Gateway (OpenAI 格式) 的呼叫"""
     
@@ -13,9 +35,47 @@ class LLMClient:
         self.base_url = os.getenv("API_BASE_URL", "http://localhost:3000/v1")
         self.api_key = os.getenv("API_KEY", "sk-antigravity-default")
         self.model = os.getenv("MODEL_NAME", "gemini-3-flash")
+        self.temperature = 0.2
+        self.cache = get_llm_cache()
+
+    async def chat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> Optional[str]:
+        """呼叫聊天補全 API (相同提示詞優先使用快取)
+
+        validate 由呼叫端提供，無法解析回應時應拋出例外：未通過檢查的新回應照常回傳
+        但不寫入快取，快取中未通過檢查的舊回應則會刪除並重新請求。
+        """
+        cache_key = None
+        if self.cache:
+            cache_key = LLMResponseCache.make_key(self.model, system_prompt, user_prompt, self.temperature)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                if self._is_valid(cached, validate):
+                    return cached
+                await self.cache.invalidate(cache_key)
+        
+        content = await self._request(system_prompt, user_prompt)
+        if content is not None and self.cache and self._is_valid(content, validate):
+            await self.cache.set(cache_key, content)
+        return content
+
+    @staticmethod
+    def _is_valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        """以呼叫端的解析函式檢查回應是否可用"""
+        if validate is None:
+            return True
+        try:
+            validate(content)
+            return True
+        except Exception:
+            return False
 
-    async def chat_completion(self, system_prompt: str, user_prompt: str) -> Optional[str]:
-        """呼叫聊天補全 API"""
+    async def _request(self, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """發送請求 (經限流器排隊，遇到 429/503 依 Retry-After 退避重試)"""
         url = f"{self.base_url}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -27,15 +87,21 @@ class LLMClient:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            "temperature": 0.2
+            "temperature": self.temperature
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
+        client = get_http_client(url)
+        limiter = get_gateway_limiter()
+        try:
+            for attempt in range(config.llm_max_retries + 1):
+                await limiter.acquire()
+                response = await client.post(url, headers=headers, json=payload, timeout=60.0)
+                if response.status_code in THROTTLE_STATUS and attempt < config.llm_max_retries:
+                    limiter.pause(parse_retry_after(response.headers.get("retry-after"), default=2.0 ** attempt))
+                    continue
                 response.raise_for_status()
                 data = response.json()
                 return data["choices"][0]["message"]["content"]
-            except Exception as e:
-                logger.error(f"❌ LLM 呼叫失敗: {e}")
-                return None
+        except Exception as e:
+            logger.error(f"❌ LLM 呼叫失敗: {e}")
+            return None
@@ -0,0 +1,177 @@
+"""
+LLM 回應快取
+============
+以 (model, system prompt, user prompt, temperature) 的雜湊為鍵，
+將 LLM 回應保存在 SQLite，重跑流程 (包含 --once 除錯) 時不必重新付費呼叫。
+支援 TTL 過期與依總大小的 LRU 淘汰，並記錄命中/未命中次數。
+只快取呼叫端驗證可解析的回應，避免格式錯誤的回應在 TTL 內被重複使用。
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+from loguru import logger
+
+from ..config import config
+
+T = TypeVar("T")
+
+# 超出容量時淘汰到上限的此比例，避免每次寫入都觸發淘汰
+EVICT_TARGET_RATIO = 0.9
+
+
+class LLMResponseCache:
+    """以內容雜湊為鍵的 LLM 回應快取
+
+    所有 SQLite 操作都排入單一專用執行緒，重用同一條連線，呼叫端只需 await，
+    不會卡住事件迴圈。總大小在記憶體中追蹤，只有超出上限時才執行 LRU 淘汰。
+    """
+    
+    def __init__(self, db_path: str = "data/llm_cache.db", ttl_secs: int = 7 * 86400, max_bytes: int = 64 * 1024 * 1024):
+        self.db_path = db_path
+        self.ttl_secs = ttl_secs
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """取得快取執行緒上的連線；首次使用時建立資料表、清除過期項目並載入總大小"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT,
+                    size INTEGER,
+                    created_at REAL,
+                    last_access REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - self.ttl_secs,))
+            conn.commit()
+            self._conn = conn
+            self._refresh_total()
+        return self._conn
+
+    def _refresh_total(self):
+        """重新計算總大小 (其他行程也可能寫入同一個快取檔)"""
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        """在快取執行緒上執行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """計算快取鍵"""
+        raw = json.dumps([model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """讀取未過期的回應，並更新最近存取時間"""
+        response = await self._run(self._get, key)
+        if response is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return response
+
+    def _get(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT response FROM llm_cache WHERE key = ? AND created_at > ?",
+            (key, now - self.ttl_secs)
+        ).fetchone()
+        if not row:
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return row[0]
+
+    async def set(self, key: str, response: str):
+        """寫入回應；總大小超出上限時才清除過期與最久未使用的項目"""
+        await self._run(self._set, key, response)
+
+    def _set(self, key: str, response: str):
+        conn = self._connect()
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        old = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        conn.execute("""
+            INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?)
+        """, (key, response, size, now, now))
+        self._total_bytes += size - (old[0] if old else 0)
+        if self._total_bytes > self.max_bytes:
+            self._evict(now)
+        conn.commit()
+
+    def _evict(self, now: float):
+        """清除過期項目，仍超出上限時由最近存取往回累計大小，淘汰超出目標的部分 (LRU)"""
+        conn = self._conn
+        conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_secs,))
+        self._refresh_total()
+        if self._total_bytes > self.max_bytes:
+            conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running
+                        FROM llm_cache
+                    ) WHERE running > ?
+                )
+            """, (int(self.max_bytes * EVICT_TARGET_RATIO),))
+            self._refresh_total()
+
+    async def invalidate(self, key: str):
+        """刪除指定項目 (例如呼叫端無法解析的回應)"""
+        await self._run(self._invalidate, key)
+
+    def _invalidate(self, key: str):
+        conn = self._connect()
+        row = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+            self._total_bytes -= row[0]
+
+    def stats(self) -> dict:
+        """命中統計"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def log_stats(self):
+        """輸出命中統計"""
+        stats = self.stats()
+        logger.info(f"🗄️ LLM 快取: 命中 {stats['hits']} / 未命中 {stats['misses']} (命中率 {stats['hit_rate']:.0%})")
+
+
+# 行程內共用的快取實例
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """取得共用的 LLM 回應快取；停用時回傳 None"""
+    global _cache
+    if not config.llm_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache(
+            ttl_secs=config.llm_cache_ttl_secs,
+            max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+        )
+    return _cache
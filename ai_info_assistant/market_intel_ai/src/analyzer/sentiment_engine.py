@@ -1,6 +1,10 @@
+import asyncio
 import json
-from typing import List
+import re
+from collections import OrderedDict
+from typing import Dict, List
 from ..models import Article
+from ..config import config
 from .llm import LLMClient
 from loguru import logger
 
@@ -41,18 +45,11 @@ class MarketSentimentAnalyzer:
 }}
 """
         
-        response = await self.llm.chat_completion(system_prompt, user_prompt)
+        response = await self.llm.chat_completion(system_prompt, user_prompt, validate=self._parse_response)
         
         if response:
             try:
-                # 清理 Markdown 代碼區塊
-                clean_json = response.strip()
-                if clean_json.startswith("```json"):
-                    clean_json = clean_json[7:-3].strip()
-                elif clean_json.startswith("```"):
-                    clean_json = clean_json[3:-3].strip()
-                
-                data = json.loads(clean_json)
+                data = self._parse_response(response)
                 
                 # 更新文章欄位
                 article.sentiment = data.get("sentiment", "neutral")
@@ -71,10 +68,71 @@ class MarketSentimentAnalyzer:
         
         return article
 
+    @staticmethod
+    def _parse_response(response: str) -> dict:
+        """解析分析結果 JSON (格式不符時拋出例外，該回應不會寫入快取)"""
+        # 清理 Markdown 代碼區塊
+        clean_json = response.strip()
+        if clean_json.startswith("```json"):
+            clean_json = clean_json[7:-3].strip()
+        elif clean_json.startswith("```"):
+            clean_json = clean_json[3:-3].strip()
+        
+        data = json.loads(clean_json)
+        if not isinstance(data, dict):
+            raise ValueError("分析結果不是 JSON 物件")
+        # market_impact_score 會轉為 trust_score，必須是數值
+        float(data.get("market_impact_score", 0))
+        return data
+
     async def batch_analyze(self, articles: List[Article]) -> List[Article]:
-        """批量分析"""
-        results = []
-        for art in articles:
-            analyzed = await self.analyze(art)
-            results.append(analyzed)
-        return results
+        """批量分析
+
+        依代號優先順序輪流派發 (每輪每個代號一則)，避免單一代號佔滿額度；
+        同時進行的 LLM 呼叫數以 LLM_MAX_IN_FLIGHT 為上限，節流退避由 LLMClient 處理。
+        回傳結果維持輸入順序。
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for index in self._fair_order(articles):
+            queue.put_nowait(index)
+        
+        results: Dict[int, Article] = {}
+        
+        async def worker():
+            while not queue.empty():
+                index = queue.get_nowait()
+                try:
+                    results[index] = await self.analyze(articles[index])
+                except Exception as e:
+                    logger.error(f"❌ 分析失敗: {articles[index].title} | {e}")
+                    results[index] = articles[index]
+        
+        workers = min(max(1, config.llm_max_in_flight), len(articles))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return [results[i] for i in range(len(articles))]
+
+    def _fair_order(self, articles: List[Article]) -> List[int]:
+        """依代號分組後輪流取出，產生派發順序 (文章索引)"""
+        groups: "OrderedDict[str, List[int]]" = OrderedDict()
+        for index, art in enumerate(articles):
+            groups.setdefault(self._ticker_of(art), []).append(index)
+        
+        ranking: Dict[str, int] = {}
+        for ticker in config.ticker_priority + config.stock_tickers:
+            ranking.setdefault(ticker, len(ranking))
+        ordered = sorted(groups.values(), key=lambda idx: ranking.get(self._ticker_of(articles[idx[0]]), len(ranking)))
+        
+        order = []
+        for round_no in range(max((len(g) for g in ordered), default=0)):
+            order.extend(g[round_no] for g in ordered if round_no < len(g))
+        return order
+
+    @staticmethod
+    def _ticker_of(article: Article) -> str:
+        """取得文章代號 (ticker 欄位，舊資料則從標題前綴 [TICKER] 或標籤推得)"""
+        if article.ticker:
+            return article.ticker
+        match = re.match(r"\[([^\]]+)\]", article.title)
+        if match:
+            return match.group(1).upper()
+        return article.tags[0].upper() if article.tags else ""
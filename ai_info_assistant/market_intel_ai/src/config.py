@@ -21,9 +21,37 @@ class AppConfig:
         os.getenv("STOCK_TICKERS", "TSLA,NVDA,AAPL,MSFT,AMD").split(",")
     ])
     
+    # 優先分析的代號 (越前面越先完成)，未列出的依 STOCK_TICKERS 順序
+    ticker_priority: List[str] = field(default_factory=lambda: [
+        t.strip().upper() for t in 
+        os.getenv("TICKER_PRIORITY", "").split(",") if t.strip()
+    ])
+    
     # 抓取數量 (每個代號)
     news_per_ticker: int = field(default_factory=lambda: int(os.getenv("NEWS_PER_TICKER", "5")))
     
+    # 多代號並行抓取設定
+    finance_concurrency: int = field(default_factory=lambda: int(os.getenv("FINANCE_CONCURRENCY", "5")))
+    finance_fetch_retries: int = field(default_factory=lambda: int(os.getenv("FINANCE_FETCH_RETRIES", "2")))
+    # 同一代號在此時間窗內只抓取一次 (同行程共用進行中的抓取結果，其餘重複請求略過)
+    fetch_coalesce_secs: float = field(default_factory=lambda: float(os.getenv("FETCH_COALESCE_SECS", "60")))
+    
+    # HTTP 連線池設定
+    http_timeout_secs: float = field(default_factory=lambda: float(os.getenv("HTTP_TIMEOUT_SECS", "30")))
+    http_max_connections_per_host: int = field(default_factory=lambda: int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10")))
+    http_keepalive_expiry_secs: float = field(default_factory=lambda: float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECS", "30")))
+    
+    # LLM 閘道並行與限流設定
+    llm_max_in_flight: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_IN_FLIGHT", "4")))
+    llm_rate_per_sec: float = field(default_factory=lambda: float(os.getenv("LLM_RATE_PER_SEC", "2")))
+    llm_burst: int = field(default_factory=lambda: int(os.getenv("LLM_BURST", "4")))
+    llm_max_retries: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_RETRIES", "3")))
+    
+    # LLM 回應快取 (data/llm_cache.db)
+    llm_cache_enabled: bool = field(default_factory=lambda: os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true")
+    llm_cache_ttl_secs: int = field(default_factory=lambda: int(os.getenv("LLM_CACHE_TTL_SECS", str(7 * 86400))))
+    llm_cache_max_mb: int = field(default_factory=lambda: int(os.getenv("LLM_CACHE_MAX_MB", "64")))
+    
     # 排程間隔 (分鐘)
     schedule_interval_mins: int = field(default_factory=lambda: int(os.getenv("SCHEDULE_INTERVAL_MINS", "60")))
     
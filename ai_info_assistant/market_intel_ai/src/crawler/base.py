@@ -1,18 +1,32 @@
 import abc
-from typing import List
+from typing import List, Optional
+import httpx
 from ..models import Article, SourceConfig
+from ..database.http_cache import FeedValidatorCache
+from ..http_client import get_http_client
 
 class BaseCrawler(abc.ABC):
     """爬蟲基底類別"""
     
     def __init__(self, config: SourceConfig):
         self.config = config
+        # 支援條件式請求的爬蟲會設定此驗證器快取
+        self.validators: Optional[FeedValidatorCache] = None
 
     @abc.abstractmethod
     async def fetch(self) -> List[Article]:
         """抓取最新的文章列表"""
         pass
 
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """借用共享連線池中對應主機的 HTTP 客戶端 (不需自行關閉)"""
+        return get_http_client(url)
+
+    def commit_validators(self):
+        """本輪文章寫入資料庫後，保存抓取時暫存的 Feed 驗證器"""
+        if self.validators is not None:
+            self.validators.commit()
+
     def clean_text(self, text: str) -> str:
         """基礎文字清洗"""
         if not text:
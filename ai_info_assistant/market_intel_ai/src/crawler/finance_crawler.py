@@ -1,30 +1,66 @@
 import asyncio
 import feedparser
 import httpx
-from typing import List
+from typing import Dict, List
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 from loguru import logger
 from .base import BaseCrawler
 from ..models import Article, SourceConfig
+from ..database.http_cache import FeedValidatorCache
+from ..config import config as app_config
+from ..http_client import get_with_retry
+
+# 本行程內進行中的代號抓取: ticker -> Task
+# 同一行程內的多個請求只共用仍在進行的抓取；抓取完成後的時間窗內 (含跨行程的排程器與 Web 服務)
+# 則由 FeedValidatorCache.claim_fetch 在 SQLite 中拒絕重抓並回傳空列表，同一批文章不會重複分析
+_inflight: Dict[str, "asyncio.Task[List[Article]]"] = {}
+
 
 class FinancialCrawler(BaseCrawler):
     """財經新聞爬蟲 (Google Finance RSS)"""
     
     BASE_URL = "https://news.google.com/rss/search"
 
+    def __init__(self, config: SourceConfig):
+        super().__init__(config)
+        self.validators = FeedValidatorCache()
+
     async def fetch(self) -> List[Article]:
         tickers = self.config.params.get("tickers", [])
         if not tickers:
             logger.warning("未設定股票代號")
             return []
 
-        all_articles = []
-        for ticker in tickers:
-            articles = await self._fetch_ticker(ticker)
-            all_articles.extend(articles)
+        semaphore = asyncio.Semaphore(max(1, app_config.finance_concurrency))
+        results = await asyncio.gather(*(self._fetch_coalesced(ticker, semaphore) for ticker in tickers))
+        
+        return [art for articles in results for art in articles]
+
+    async def _fetch_coalesced(self, ticker: str, semaphore: asyncio.Semaphore) -> List[Article]:
+        """抓取單一代號；已有相同代號的抓取正在進行時直接共用其結果"""
+        loop = asyncio.get_running_loop()
+        task = _inflight.get(ticker)
         
-        return all_articles
+        if task and task.get_loop() is loop and not task.done():
+            logger.debug(f"🔗 {ticker}: 共用進行中的抓取")
+        else:
+            async def limited() -> List[Article]:
+                async with semaphore:
+                    return await self._fetch_ticker(ticker)
+            
+            def forget(done: "asyncio.Task[List[Article]]"):
+                if _inflight.get(ticker) is done:
+                    del _inflight[ticker]
+            
+            task = loop.create_task(limited())
+            task.add_done_callback(forget)
+            _inflight[ticker] = task
+        
+        # shield: 單一等待者被取消時不影響其他共用者
+        articles = await asyncio.shield(task)
+        # 各呼叫端會各自修改文章 (情緒分析)，因此回傳副本
+        return [art.model_copy(deep=True) for art in articles]
 
     async def _fetch_ticker(self, ticker: str) -> List[Article]:
         params = {
@@ -34,11 +70,27 @@ class FinancialCrawler(BaseCrawler):
             "ceid": "US:en"
         }
         
+        feed_url = str(httpx.URL(self.BASE_URL, params=params))
+        # SQLite 操作可能等待其他行程的寫入鎖，移至背景執行緒避免卡住事件迴圈
+        claimed_at = await asyncio.to_thread(self.validators.claim_fetch, feed_url, app_config.fetch_coalesce_secs)
+        if claimed_at is None:
+            # 時間窗內已有抓取 (通常來自另一個行程)，文章由該次抓取負責分析並寫入資料庫
+            logger.info(f"🔗 {ticker}: {app_config.fetch_coalesce_secs:g}s 內已有其他抓取，略過")
+            return []
+        
         try:
             logger.info(f"🔍 正在抓取 {ticker} 的財經新聞...")
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.BASE_URL, params=params)
-                response.raise_for_status()
+            headers = await asyncio.to_thread(self.validators.conditional_headers, feed_url)
+            response = await get_with_retry(
+                feed_url,
+                retries=app_config.finance_fetch_retries,
+                headers=headers,
+                timeout=10.0,
+            )
+            if response.status_code == 304:
+                logger.info(f"✅ {ticker}: 新聞未變更 (304)，略過解析")
+                return []
+            response.raise_for_status()
                 
             feed = feedparser.parse(response.content)
             articles = []
@@ -58,16 +110,19 @@ class FinancialCrawler(BaseCrawler):
                         source="finance",
                         published_date=pub_date,
                         trust_score=0.0,  # 待 AI 評分
-                        tags=[ticker, "Stock"]
+                        tags=[ticker, "Stock"],
+                        ticker=ticker.upper()
                     )
                     articles.append(article)
                 except Exception as e:
                     logger.warning(f"解析新聞條目失敗: {e}")
                     continue
                     
+            self.validators.stage_from_headers(feed_url, response.headers)
             logger.success(f"✅ {ticker}: 取得 {len(articles)} 則新聞")
             return articles
             
         except Exception as e:
             logger.error(f"❌ 抓取 {ticker} 失敗: {e}")
+            await asyncio.to_thread(self.validators.release_fetch, feed_url, claimed_at)
             return []
@@ -0,0 +1,73 @@
+"""
+非同步資料庫存取層
+==================
+FastAPI handler 若直接呼叫 sqlite3，整個查詢期間都會卡住事件迴圈。
+AsyncDatabaseManager 把所有資料庫操作排入單一專用執行緒的佇列依序執行，
+並重用同一個 DatabaseManager 連線 (含 prepared statement 快取)，
+handler 只需 await，其他請求在查詢或排程器寫入期間照常處理。
+"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, TypeVar
+
+from .storage import DatabaseManager
+from ..models import Article
+
+T = TypeVar("T")
+
+
+class AsyncDatabaseManager:
+    """DatabaseManager 的非同步外觀 (單一 DB 執行緒 + 工作佇列)"""
+    
+    def __init__(self, db_path: str = "data/market.db"):
+        self.db_path = db_path
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._db: Optional[DatabaseManager] = None
+
+    async def open(self):
+        """啟動 DB 執行緒並在其上建立連線 (同時確保資料表與索引存在)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+            self._db = await self.run(DatabaseManager, self.db_path)
+
+    async def close(self):
+        """關閉連線並停止 DB 執行緒"""
+        if self._executor is None:
+            return
+        await self.run(self._db.close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._db = None
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """在 DB 執行緒上執行任意函式"""
+        if self._executor is None:
+            raise RuntimeError("AsyncDatabaseManager 尚未開啟")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return await self.run(self._db.fetchall, sql, params)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return await self.run(self._db.fetchone, sql, params)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        return await self.run(self._db.execute, sql, params)
+
+    async def get_write_generation(self) -> int:
+        return await self.run(self._db.get_write_generation)
+
+    async def get_existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        return await self.run(self._db.get_existing_ids, list(ids))
+
+    async def save_articles(self, articles: List[Article]):
+        await self.run(self._db.save_articles, articles)
+
+    async def delete_article(self, article_id: str):
+        await self.run(self._db.delete_article, article_id)
+
+    async def get_ticker_stats(self) -> Dict[str, dict]:
+        return await self.run(self._db.get_ticker_stats)
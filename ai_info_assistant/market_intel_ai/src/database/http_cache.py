@@ -0,0 +1,117 @@
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Tuple
+from loguru import logger
+
+
+class FeedValidatorCache:
+    """HTTP 驗證器快取 (ETag / Last-Modified)
+
+    為每個 Feed URL 保存上次回應的驗證器，下次抓取時送出條件式請求；
+    伺服器回傳 304 代表內容未變，爬蟲即可略過下載與解析。
+
+    爬蟲抓取時只暫存驗證器，待流程將本輪文章寫入資料庫後才呼叫 commit()；
+    若評分、提煉或寫入失敗，下一輪不會收到 304 而遺失這批文章。
+
+    另記錄每個 Feed 最近一次開始抓取的時間 (fetched_at)，排程器與 Web 服務
+    分屬不同行程，藉此在時間窗內只讓其中一方實際抓取 (claim_fetch)。
+    """
+    
+    def __init__(self, db_path: str = "data/market.db"):
+        self.db_path = db_path
+        self._pending: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._init_db()
+
+    def _init_db(self):
+        """初始化資料表"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated_at TEXT,
+                    fetched_at REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(feed_validators)")}
+            if "fetched_at" not in columns:
+                conn.execute("ALTER TABLE feed_validators ADD COLUMN fetched_at REAL")
+            conn.commit()
+
+    def get(self, url: str) -> Dict[str, Optional[str]]:
+        """取得指定 URL 的驗證器 {"etag": ..., "last_modified": ...}"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified FROM feed_validators WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return {"etag": None, "last_modified": None}
+        return {"etag": row[0], "last_modified": row[1]}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """產生條件式請求標頭 (If-None-Match / If-Modified-Since)"""
+        validators = self.get(url)
+        headers = {}
+        if validators["etag"]:
+            headers["If-None-Match"] = validators["etag"]
+        if validators["last_modified"]:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def save(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """保存驗證器；兩者皆無時不寫入"""
+        if not etag and not last_modified:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO feed_validators (url, etag, last_modified, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    updated_at = excluded.updated_at
+            """, (url, etag, last_modified, datetime.now().isoformat()))
+            conn.commit()
+
+    def claim_fetch(self, url: str, window_secs: float) -> Optional[float]:
+        """在時間窗內取得抓取權 (跨行程)
+
+        最近 window_secs 秒內已有任一行程開始抓取同一 Feed 時回傳 None，
+        否則原子地記錄本次抓取時間並回傳該時間。
+        """
+        now = time.time()
+        with sqlite3.connect(self.db_path, timeout=10) as conn:
+            cursor = conn.execute("""
+                INSERT INTO feed_validators (url, fetched_at) VALUES (?, ?)
+                ON CONFLICT(url) DO UPDATE SET fetched_at = excluded.fetched_at
+                WHERE fetched_at IS NULL OR fetched_at <= ?
+            """, (url, now, now - window_secs))
+            conn.commit()
+        return now if cursor.rowcount > 0 else None
+
+    def release_fetch(self, url: str, claimed_at: float):
+        """抓取失敗時釋放抓取權，讓其他行程不必等到時間窗結束"""
+        with sqlite3.connect(self.db_path, timeout=10) as conn:
+            conn.execute(
+                "UPDATE feed_validators SET fetched_at = NULL WHERE url = ? AND fetched_at = ?",
+                (url, claimed_at)
+            )
+            conn.commit()
+
+    def stage_from_headers(self, url: str, headers: Mapping[str, str]):
+        """暫存 HTTP 回應標頭中的驗證器，待 commit() 時才保存"""
+        self._pending[url] = (headers.get("etag"), headers.get("last-modified"))
+
+    def commit(self):
+        """保存所有暫存的驗證器 (應於本輪文章已寫入資料庫後呼叫)"""
+        pending, self._pending = self._pending, {}
+        for url, (etag, last_modified) in pending.items():
+            self.save(url, etag, last_modified)
+        if pending:
+            logger.debug(f"🏷️ 更新 {len(pending)} 個 Feed 驗證器")
+
+    def discard(self):
+        """捨棄暫存的驗證器 (流程失敗或逾時時呼叫，下一輪將完整重抓)"""
+        self._pending.clear()
@@ -1,20 +1,74 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import List, Set
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 from ..models import Article
 from loguru import logger
 
 class DatabaseManager:
-    """SQLite 資料庫管理器"""
+    """SQLite 資料庫管理器
+
+    每個實例持有一條長期連線 (以鎖保護，可跨執行緒使用)，並啟用 WAL 模式，
+    讓 Web 端讀取不會被排程器寫入阻塞。
+    """
+    
+    # 連線調校參數
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",   # WAL 模式下 NORMAL 已可保證資料庫一致性
+        "PRAGMA cache_size=-20000",    # 約 20 MB 頁面快取
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
     
     def __init__(self, db_path: str = "data/market.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()
+        # cached_statements: 重複的查詢字串直接重用已編譯的 prepared statement
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for pragma in self.PRAGMAS:
+            self._conn.execute(pragma)
         self._init_db()
 
+    def close(self):
+        """關閉連線"""
+        with self._lock:
+            self._conn.close()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """執行唯讀查詢，回傳可用欄位名稱存取的列"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(sql, params).fetchall()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """執行唯讀查詢，回傳第一列 (無結果時為 None)"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """執行單一寫入語句並提交，回傳影響列數"""
+        with self._lock, self._conn as conn:
+            rowcount = conn.execute(sql, params).rowcount
+            self._bump_generation(conn)
+            return rowcount
+
+    def _bump_generation(self, conn: sqlite3.Connection):
+        """遞增寫入世代 (與資料寫入同一交易)"""
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'write_generation'")
+
+    def get_write_generation(self) -> int:
+        """目前的寫入世代 (單一主鍵查詢)"""
+        row = self.fetchone("SELECT value FROM meta WHERE key = 'write_generation'")
+        return row[0] if row else 0
+
     def _init_db(self):
         """初始化資料表"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS articles (
@@ -41,47 +95,176 @@ class DatabaseManager:
                 cursor.execute("ALTER TABLE articles ADD COLUMN rlm_analysis TEXT")
             except sqlite3.OperationalError:
                 pass  # 欄位已存在
-            conn.commit()
+            # 寫入世代：每次寫入遞增，跨行程 (排程器 / Web) 的快取以此判斷是否失效
+            cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('write_generation', 0)")
+            try:
+                cursor.execute("ALTER TABLE articles ADD COLUMN ticker TEXT")
+                self._backfill_tickers(cursor)
+            except sqlite3.OperationalError:
+                pass  # 欄位已存在
+            
+            # Dashboard 查詢索引：全部市場 / 單一代號，各依影響力與發布時間排序
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_score ON articles (market_impact_score DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_date DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_ticker_score ON articles (ticker, market_impact_score DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_ticker_published ON articles (ticker, published_date DESC)")
+            
+            # 各代號情緒統計 (寫入時增量更新，Dashboard 直接讀取)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ticker_stats (
+                    ticker TEXT PRIMARY KEY,
+                    article_count INTEGER,
+                    bullish_count INTEGER,
+                    bearish_count INTEGER,
+                    neutral_count INTEGER,
+                    avg_impact_score REAL,
+                    last_published TEXT
+                )
+            """)
+            if cursor.execute("SELECT COUNT(*) FROM ticker_stats").fetchone()[0] == 0:
+                self._refresh_ticker_stats(cursor)
+
+    def _backfill_tickers(self, cursor: sqlite3.Cursor):
+        """遷移：從舊資料的標題前綴 [TICKER] 回填 ticker 欄位"""
+        cursor.execute("""
+            UPDATE articles
+            SET ticker = UPPER(SUBSTR(title, 2, INSTR(title, ']') - 2))
+            WHERE ticker IS NULL AND title LIKE '[%]%' AND INSTR(title, ']') > 2
+        """)
+        logger.info(f"🔄 已回填 {cursor.rowcount} 篇文章的 ticker 欄位")
+
+    def _refresh_ticker_stats(self, cursor: sqlite3.Cursor, tickers: Iterable[str] = None):
+        """重新計算指定代號 (預設全部) 的情緒統計，沿 ticker 索引彙總"""
+        if tickers is None:
+            cursor.execute("DELETE FROM ticker_stats")
+            tickers = [row[0] for row in cursor.execute(
+                "SELECT DISTINCT ticker FROM articles WHERE ticker IS NOT NULL"
+            ).fetchall()]
+        
+        for ticker in set(tickers):
+            cursor.execute("""
+                SELECT COUNT(*),
+                       SUM(sentiment = 'bullish'),
+                       SUM(sentiment = 'bearish'),
+                       SUM(sentiment = 'neutral'),
+                       AVG(market_impact_score),
+                       MAX(published_date)
+                FROM articles WHERE ticker = ?
+            """, (ticker,))
+            row = cursor.fetchone()
+            if row[0] == 0:
+                cursor.execute("DELETE FROM ticker_stats WHERE ticker = ?", (ticker,))
+                continue
+            cursor.execute("""
+                INSERT OR REPLACE INTO ticker_stats
+                (ticker, article_count, bullish_count, bearish_count, neutral_count, avg_impact_score, last_published)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (ticker, *row))
+
+    def get_ticker_stats(self) -> Dict[str, dict]:
+        """回傳各代號的情緒統計: ticker -> 統計欄位"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT * FROM ticker_stats")
+            columns = [col[0] for col in cursor.description]
+            return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    # 單一 IN 查詢的參數上限 (低於 SQLite 預設的 999 變數限制)
+    ID_LOOKUP_CHUNK = 500
+
+    def get_existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        """回傳候選 ID 中已存在於資料庫者 (以主鍵批次查詢，成本與候選數量成正比)"""
+        candidates = list(dict.fromkeys(ids))
+        existing = set()
+        with self._lock:
+            cursor = self._conn.cursor()
+            for i in range(0, len(candidates), self.ID_LOOKUP_CHUNK):
+                chunk = candidates[i:i + self.ID_LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT id FROM articles WHERE id IN ({placeholders})", chunk)
+                existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    def _tickers_of(self, cursor: sqlite3.Cursor, ids: Sequence[str]) -> Set[str]:
+        """查詢指定文章目前所屬的代號 (呼叫端需持有鎖)"""
+        tickers = set()
+        for i in range(0, len(ids), self.ID_LOOKUP_CHUNK):
+            chunk = ids[i:i + self.ID_LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT DISTINCT ticker FROM articles WHERE id IN ({placeholders}) AND ticker IS NOT NULL", chunk)
+            tickers.update(row[0] for row in cursor.fetchall())
+        return tickers
+
+    def count_articles(self) -> int:
+        """文章總數"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
 
     def get_processed_ids(self) -> Set[str]:
-        """獲取所有已處理過的文章 ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """獲取所有已處理過的文章 ID (會載入全部歷史，去重請改用 get_existing_ids)"""
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute("SELECT id FROM articles")
             return {row[0] for row in cursor.fetchall()}
 
     def save_articles(self, articles: List[Article]):
-        """批量保存文章"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            for art in articles:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO articles 
-                    (id, title, authors, summary, ai_summary, tags, url, source, published_date, trust_score, processed_at, sentiment, market_impact_score, key_risks)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    art.id,
-                    art.title,
-                    ",".join(art.authors),
-                    art.summary,
-                    art.ai_summary,
-                    json.dumps(art.tags),
-                    art.url,
-                    art.source,
-                    art.published_date.isoformat(),
-                    art.trust_score,
-                    datetime.now().isoformat(),
-                    art.sentiment,
-                    art.market_impact_score,
-                    json.dumps(art.key_risks)
-                ))
-            conn.commit()
-            logger.info(f"💾 成功保存 {len(articles)} 篇文章到資料庫")
+        """批量保存文章 (單一交易內以 executemany 執行 upsert)"""
+        processed_at = datetime.now().isoformat()
+        rows = [
+            (
+                art.id,
+                art.title,
+                ",".join(art.authors),
+                art.summary,
+                art.ai_summary,
+                json.dumps(art.tags),
+                art.url,
+                art.source,
+                art.published_date.isoformat(),
+                art.trust_score,
+                processed_at,
+                art.sentiment,
+                art.market_impact_score,
+                json.dumps(art.key_risks),
+                art.ticker
+            )
+            for art in articles
+        ]
+        with self._lock, self._conn as conn:
+            # upsert 可能把文章移到其他代號，原代號的統計也需要重算
+            affected = self._tickers_of(conn.cursor(), [art.id for art in articles])
+            affected.update(art.ticker for art in articles if art.ticker)
+            conn.executemany("""
+                INSERT INTO articles 
+                (id, title, authors, summary, ai_summary, tags, url, source, published_date, trust_score, processed_at, sentiment, market_impact_score, key_risks, ticker)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    summary = excluded.summary,
+                    ai_summary = excluded.ai_summary,
+                    tags = excluded.tags,
+                    url = excluded.url,
+                    source = excluded.source,
+                    published_date = excluded.published_date,
+                    trust_score = excluded.trust_score,
+                    processed_at = excluded.processed_at,
+                    sentiment = excluded.sentiment,
+                    market_impact_score = excluded.market_impact_score,
+                    key_risks = excluded.key_risks,
+                    ticker = COALESCE(excluded.ticker, articles.ticker)
+            """, rows)
+            self._bump_generation(conn)
+            self._refresh_ticker_stats(conn.cursor(), affected)
+        logger.info(f"💾 成功保存 {len(articles)} 篇文章到資料庫")
 
     def delete_article(self, article_id: str):
         """刪除指定文章"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM articles WHERE id = ?", (article_id,))
-            conn.commit()
-            logger.info(f"🗑️ 已從資料庫刪除文章: {article_id}")
+        with self._lock, self._conn as conn:
+            row = conn.execute("SELECT ticker FROM articles WHERE id = ?", (article_id,)).fetchone()
+            conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+            self._bump_generation(conn)
+            if row and row[0]:
+                self._refresh_ticker_stats(conn.cursor(), [row[0]])
+        logger.info(f"🗑️ 已從資料庫刪除文章: {article_id}")
@@ -22,6 +22,7 @@ class Article(BaseModel):
     sentiment: str = Field("neutral", description="市場情緒 (bullish, bearish, neutral)")
     market_impact_score: int = Field(0, description="市場影響力分數 (0-100)")
     key_risks: List[str] = Field(default_factory=list, description="潛在風險點")
+    ticker: Optional[str] = Field(None, description="股票代號 (正規化為大寫)")
 
 class SourceConfig(BaseModel):
     """資訊源配置"""
@@ -1,18 +1,31 @@
-import sqlite3
 import json
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from ..config import config
 from ..crawler.finance_crawler import FinancialCrawler
 from ..analyzer.sentiment_engine import MarketSentimentAnalyzer
-from ..database.storage import DatabaseManager
+from ..database.async_db import AsyncDatabaseManager
 from ..models import SourceConfig
+from ..http_client import close_http_clients
+from .response_cache import GenerationCache, make_etag, is_not_modified
 import asyncio
 
-app = FastAPI(title="Market Intel AI")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 啟動 DB 執行緒 (同時確保資料表、索引與 ticker 回填遷移已完成)
+    await db.open()
+    yield
+    # 關閉背景任務使用的共享連線池
+    await close_http_clients()
+    await db.close()
+
+
+app = FastAPI(title="Market Intel AI", lifespan=lifespan)
 
 # 路徑設定
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -20,6 +33,10 @@ templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
 app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), name="static")
 
 DB_PATH = PROJECT_ROOT / "data" / "market.db"
+db = AsyncDatabaseManager(str(DB_PATH))
+
+# 渲染後 Dashboard 的快取 (寫入世代變動即失效)
+html_cache = GenerationCache(max_entries=64)
 
 async def fetch_and_analyze_ticker(ticker: str):
     """背景任務：抓取並分析新加入的 Ticker"""
@@ -30,22 +47,24 @@ async def fetch_and_analyze_ticker(ticker: str):
     raw_articles = await crawler.fetch()
     
     if not raw_articles:
+        crawler.commit_validators()
         return
 
     # 2. 過濾
-    db = DatabaseManager(str(DB_PATH))
-    processed_ids = db.get_processed_ids()
+    processed_ids = await db.get_existing_ids(a.id for a in raw_articles)
     new_articles = [a for a in raw_articles if a.id not in processed_ids]
     
     if not new_articles:
+        crawler.commit_validators()
         return
 
     # 3. 分析
     analyzer = MarketSentimentAnalyzer()
     analyzed_articles = await analyzer.batch_analyze(new_articles)
     
-    # 4. 存檔
-    db.save_articles(analyzed_articles)
+    # 4. 存檔 (寫入後才保存 Feed 驗證器)
+    await db.save_articles(analyzed_articles)
+    crawler.commit_validators()
     print(f"✅ [Background] 完成新標的分析: {ticker}")
 
 @app.post("/api/tickers")
@@ -73,55 +92,69 @@ async def remove_ticker(ticker: str):
 async def home(request: Request, ticker: str = "all", sort: str = "score"):
     """首頁 Dashboard"""
     
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # 1. 獲取所有監控的 Tickers
-        tickers = config.stock_tickers
-        
-        # 2. 查詢文章
-        query = """
-            SELECT id, title, source, ai_summary, tags, url, 
-                   sentiment, market_impact_score, key_risks, published_date 
-            FROM articles 
-        """
-        params = []
-        
-        if ticker != "all":
-            query += " WHERE title LIKE ?"
-            params.append(f"%[{ticker}]%")
-            
-        # 排序邏輯
-        if sort == "score":
-            query += " ORDER BY market_impact_score DESC"
-        else:
-            query += " ORDER BY published_date DESC"
-            
-        query += " LIMIT 50"
+    # 1. 獲取所有監控的 Tickers (清單可在執行期增減，因此納入快取鍵)
+    tickers = config.stock_tickers
+    
+    generation = await db.get_write_generation()
+    key = (ticker, sort, tuple(tickers))
+    etag = make_etag(generation, key)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    body = html_cache.get(key, generation)
+    if body is None:
+        body = await render_dashboard(request, ticker, sort, tickers)
+        html_cache.set(key, generation, body)
+    return HTMLResponse(body, headers={"ETag": etag})
+
+
+async def render_dashboard(request: Request, ticker: str, sort: str, tickers: list) -> bytes:
+    """查詢並渲染 Dashboard 頁面"""
+    # 2. 查詢文章
+    query = """
+        SELECT id, title, source, ai_summary, tags, url, 
+               sentiment, market_impact_score, key_risks, published_date 
+        FROM articles 
+    """
+    params = []
+    
+    if ticker != "all":
+        query += " WHERE ticker = ?"
+        params.append(ticker.upper())
         
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
+    # 排序邏輯
+    if sort == "score":
+        query += " ORDER BY market_impact_score DESC"
+    else:
+        query += " ORDER BY published_date DESC"
         
-        articles = []
-        for row in rows:
-            articles.append({
-                "id": row["id"],
-                "title": row["title"],
-                "source": row["source"],
-                "ai_summary": row["ai_summary"] or "等待分析...",
-                "tags": json.loads(row["tags"]) if row["tags"] else [],
-                "url": row["url"],
-                "sentiment": row["sentiment"],
-                "score": row["market_impact_score"],
-                "key_risks": json.loads(row["key_risks"]) if row["key_risks"] else [],
-                "published_date": row["published_date"]
-            })
+    query += " LIMIT 50"
+    
+    rows = await db.fetchall(query, tuple(params))
+    
+    articles = []
+    for row in rows:
+        articles.append({
+            "id": row["id"],
+            "title": row["title"],
+            "source": row["source"],
+            "ai_summary": row["ai_summary"] or "等待分析...",
+            "tags": json.loads(row["tags"]) if row["tags"] else [],
+            "url": row["url"],
+            "sentiment": row["sentiment"],
+            "score": row["market_impact_score"],
+            "key_risks": json.loads(row["key_risks"]) if row["key_risks"] else [],
+            "published_date": row["published_date"]
+        })
+    
+    # 3. 各代號情緒統計 (預先彙總)
+    ticker_stats = await db.get_ticker_stats()
 
     return templates.TemplateResponse("index.html", {
         "request": request,
         "articles": articles,
         "tickers": tickers,
         "current_ticker": ticker,
-        "current_sort": sort
-    })
+        "current_sort": sort,
+        "ticker_stats": ticker_stats
+    }).body
@@ -0,0 +1,49 @@
+"""
+回應快取
+========
+Dashboard 資料只在排程器 (或 Web 端操作) 寫入時才會變動。
+以 DatabaseManager 的寫入世代作為版本：世代未變時直接回傳上次的查詢結果 / 渲染好的頁面，
+並提供 ETag，讓瀏覽器以 If-None-Match 取得 304。
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from fastapi import Request
+
+
+class GenerationCache:
+    """以寫入世代判斷失效的 LRU 快取"""
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """取得快取值；世代不符 (資料已變動) 時視為未命中"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != generation:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, generation: int, value: Any):
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def make_etag(generation: int, key: Hashable) -> str:
+    """由寫入世代與請求參數組成弱 ETag"""
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    return f'W/"{generation}-{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """瀏覽器帶來的 If-None-Match 是否已包含目前的 ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
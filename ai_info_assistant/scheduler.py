@@ -12,21 +12,28 @@ AI 資訊助理 - 定時排程腳本
 
 import asyncio
 import argparse
+import time
+from contextlib import aclosing
 from datetime import datetime
+from typing import Dict, List, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from loguru import logger
 
 from src.crawler.arxiv import ArxivCrawler
+from src.crawler.base import BaseCrawler
 from src.crawler.github import GithubCrawler
 from src.crawler.hackernews import HackerNewsCrawler
 from src.crawler.reddit import RedditCrawler
 from src.scoring.engine import ScoringEngine
 from src.scoring.relevance import RelevanceScorer
 from src.refiner.engine import RefinerEngine
+from src.refiner.llm_cache import get_llm_cache
 from src.database.storage import DatabaseManager
-from src.models import SourceConfig
+from src.models import Article, SourceConfig
 from src.config import config
+from src.http_client import close_http_clients
+from src.events import event_bus
 
 
 CRAWLER_MAP = {
@@ -37,79 +44,139 @@ CRAWLER_MAP = {
 }
 
 
+async def fetch_source(cfg: SourceConfig, semaphore: asyncio.Semaphore) -> Tuple[BaseCrawler, List[Article], float]:
+    """在共享並行額度下抓取單一來源，逾時則採用部分結果"""
+    crawler = CRAWLER_MAP[cfg.name](cfg)
+    timeout = cfg.timeout_secs or config.crawler_timeout_secs
+    
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            fetched, timed_out = await crawler.fetch_with_deadline(timeout)
+        except Exception as e:
+            logger.error(f"❌ {cfg.name} 抓取失敗: {e}")
+            fetched, timed_out = list(crawler.partial_results), False
+            crawler.discard_validators()
+        elapsed = time.perf_counter() - start
+    
+    if timed_out:
+        # 未完整抓取的 Feed 不保存驗證器，避免下一輪收到 304 而漏掉其餘文章
+        crawler.discard_validators()
+        logger.warning(f"⏱️ {cfg.name}: 超過 {timeout:g}s 期限，採用部分結果 {len(fetched)} 篇")
+    logger.info(f"⏱️ {cfg.name}: 抓取耗時 {elapsed:.2f}s ({len(fetched)} 篇)")
+    return crawler, fetched, elapsed
+
+
+async def fetch_all_sources(configs: List[SourceConfig]) -> Tuple[Dict[str, List[Article]], List[BaseCrawler]]:
+    """同時抓取所有來源，總耗時取決於最慢的來源
+
+    Returns:
+        (來源名稱 -> 文章列表, 本輪使用的爬蟲)
+    """
+    semaphore = asyncio.Semaphore(max(1, config.crawler_concurrency))
+    enabled = [cfg for cfg in configs if cfg.enabled and cfg.name in CRAWLER_MAP]
+    
+    results = await asyncio.gather(*(fetch_source(cfg, semaphore) for cfg in enabled))
+    if results:
+        slowest_cfg, (_, _, slowest_elapsed) = max(zip(enabled, results), key=lambda r: r[1][2])
+        logger.info(f"🐢 最慢來源: {slowest_cfg.name} ({slowest_elapsed:.2f}s)")
+    fetched_by_source = {cfg.name: fetched for cfg, (_, fetched, _) in zip(enabled, results)}
+    return fetched_by_source, [crawler for crawler, _, _ in results]
+
+
 async def run_pipeline():
     """執行完整的抓取-評分-提煉流程"""
     start_time = datetime.now()
     logger.info(f"🚀 [{start_time.strftime('%H:%M:%S')}] 開始執行資訊擷取流程...")
     
-    # 初始化
+    # 初始化 (每輪結束即關閉連線，避免排程長期執行時累積 WAL 連線與檔案控制代碼)
     db = DatabaseManager()
-    processed_ids = db.get_processed_ids()
-    logger.info(f"📊 資料庫已有 {len(processed_ids)} 條記錄")
-
-    # 1. 定義資訊源配置 (使用 config.py 的設定)
-    configs = [
-        SourceConfig(name="arxiv", params={"query": "cat:cs.AI OR cat:cs.LG", "max_results": config.arxiv_max_results}),
-        SourceConfig(name="github", params={"language": config.github_language}),
-        SourceConfig(name="hn", params={"max_items": config.hn_max_items}),
-        SourceConfig(name="reddit", params={"subreddits": config.reddit_subreddits, "max_items": config.reddit_max_items})
-    ]
-    
-    # 2. 抓取並過濾
+    try:
+        logger.info(f"📊 資料庫已有 {db.count_articles()} 條記錄")
+
+        # 1. 定義資訊源配置 (使用 config.py 的設定)
+        configs = [
+            SourceConfig(name="arxiv", params={"query": "cat:cs.AI OR cat:cs.LG", "max_results": config.arxiv_max_results}),
+            SourceConfig(name="github", params={"language": config.github_language}),
+            SourceConfig(name="hn", params={"max_items": config.hn_max_items}),
+            SourceConfig(name="reddit", params={"subreddits": config.reddit_subreddits, "max_items": config.reddit_max_items})
+        ]
+    
+        # 2. 並行抓取
+        fetch_start = time.perf_counter()
+        fetched_by_source, crawlers = await fetch_all_sources(configs)
+        logger.info(f"📡 並行抓取完成，耗時 {time.perf_counter() - fetch_start:.2f}s")
+    
+        refined_count = await process_fetched(db, fetched_by_source)
+    
+        # 本輪文章皆已寫入資料庫後才保存 Feed 驗證器；流程中途失敗時下一輪會完整重抓
+        for crawler in crawlers:
+            await crawler.commit_validators()
+    
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.success(f"🎉 流程完成！提煉 {refined_count} 篇，耗時 {elapsed:.1f}s")
+    finally:
+        db.close()
+
+
+async def process_fetched(db: DatabaseManager, fetched_by_source: Dict[str, List[Article]]) -> int:
+    """過濾、評分、提煉並保存本輪抓取的文章，回傳保存篇數"""
+    # 關鍵字過濾
+    filtered_by_source = {
+        name: [a for a in fetched if config.matches_interests(a.title + " " + a.summary)]
+        for name, fetched in fetched_by_source.items()
+    }
+    # 只查詢本輪候選是否已處理過
+    processed_ids = db.get_existing_ids(a.id for filtered in filtered_by_source.values() for a in filtered)
+    
     raw_articles = []
-    for cfg in configs:
-        crawler_cls = CRAWLER_MAP.get(cfg.name)
-        if not crawler_cls:
-            continue
-        crawler = crawler_cls(cfg)
-        fetched = await crawler.fetch()
-        
-        # 關鍵字過濾
-        filtered = [a for a in fetched if config.matches_interests(a.title + " " + a.summary)]
+    for name, fetched in fetched_by_source.items():
+        filtered = filtered_by_source[name]
         new_items = [a for a in filtered if a.id not in processed_ids]
         raw_articles.extend(new_items)
-        logger.info(f"📥 {cfg.name}: 抓取 {len(fetched)} -> 關鍵字過濾 {len(filtered)} -> 新內容 {len(new_items)}")
+        logger.info(f"📥 {name}: 抓取 {len(fetched)} -> 關鍵字過濾 {len(filtered)} -> 新內容 {len(new_items)}")
     
     if not raw_articles:
         logger.success("✨ 沒有新的相關內容！")
-        return
+        return 0
 
     # 3. 傳統評分
     scoring_engine = ScoringEngine()
     scored_articles = scoring_engine.process_articles(raw_articles)
     
-    # 4. LLM 二階段相關性評分 (只處理前 10 名)
+    # 4. LLM 二階段相關性評分 (只處理前 RELEVANCE_TOP_N 名)
     relevance_scorer = RelevanceScorer()
-    top_candidates = scored_articles[:10]
+    top_candidates = scored_articles[:config.relevance_top_n]
     relevance_results = await relevance_scorer.score_batch(top_candidates)
     relevant_articles = relevance_scorer.filter_relevant(relevance_results)
     
     if not relevant_articles:
         logger.info("⚠️ 沒有文章通過相關性評分")
-        return
+        return 0
 
-    # 5. 深度提煉
+    # 5. 深度提煉並保存 (每完成一篇立即寫入資料庫)
     refiner = RefinerEngine()
-    refined_articles = await refiner.batch_refine(relevant_articles, top_n=len(relevant_articles))
-    
-    # 6. 保存
-    db.save_articles(refined_articles)
+    refined_count = 0
+    async with aclosing(refiner.refine_stream(relevant_articles, top_n=len(relevant_articles))) as stream:
+        async for refined in stream:
+            db.save_articles([refined])
+            event_bus.publish("article_saved", {"id": refined.id, "title": refined.title, "source": refined.source})
+            refined_count += 1
     
-    elapsed = (datetime.now() - start_time).total_seconds()
-    logger.success(f"🎉 流程完成！提煉 {len(refined_articles)} 篇，耗時 {elapsed:.1f}s")
+    llm_cache = get_llm_cache()
+    if llm_cache:
+        llm_cache.log_stats()
+    return refined_count
+
+
+async def run_once():
+    """單次執行流程，結束後釋放共享連線池"""
+    try:
+        await run_pipeline()
+    finally:
+        await close_http_clients()
 
 
-def main():
-    parser = argparse.ArgumentParser(description="AI 資訊助理定時排程")
-    parser.add_argument("--interval", type=int, default=config.schedule_interval_mins, help="執行間隔 (分鐘)")
-    parser.add_argument("--once", action="store_true", help="只執行一次")
-    args = parser.parse_args()
-    
-    if args.once:
-        logger.info("🔄 單次執行模式")
-        asyncio.run(run_pipeline())
-        return
-    
 async def start_scheduler(interval_mins: int):
     """啟動非同步排程器"""
     scheduler = AsyncIOScheduler()
@@ -128,9 +195,11 @@ async def start_scheduler(interval_mins: int):
     try:
         while True:
             await asyncio.sleep(3600)  # 保持循環運行
-    except (KeyboardInterrupt, SystemExit):
+    except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
         logger.info("👋 排程已停止")
         scheduler.shutdown()
+    finally:
+        await close_http_clients()
 
 
 def main():
@@ -141,7 +210,7 @@ def main():
     
     if args.once:
         logger.info("🔄 單次執行模式")
-        asyncio.run(run_pipeline())
+        asyncio.run(run_once())
         return
     
     try:
@@ -18,8 +18,23 @@ class AppConfig:
     # 抓取數量
     arxiv_max_results: int = field(default_factory=lambda: int(os.getenv("ARXIV_MAX_RESULTS", "20")))
     hn_max_items: int = field(default_factory=lambda: int(os.getenv("HN_MAX_ITEMS", "30")))
+    
+    # Hacker News 項目並行抓取設定
+    hn_concurrency: int = field(default_factory=lambda: int(os.getenv("HN_CONCURRENCY", "10")))
+    hn_item_timeout_secs: float = field(default_factory=lambda: float(os.getenv("HN_ITEM_TIMEOUT_SECS", "10")))
+    hn_item_retries: int = field(default_factory=lambda: int(os.getenv("HN_ITEM_RETRIES", "2")))
+    hn_item_cache_ttl_secs: int = field(default_factory=lambda: int(os.getenv("HN_ITEM_CACHE_TTL_SECS", "600")))
     github_language: str = field(default_factory=lambda: os.getenv("GITHUB_LANGUAGE", "python"))
     
+    # 並行抓取設定
+    crawler_concurrency: int = field(default_factory=lambda: int(os.getenv("CRAWLER_CONCURRENCY", "4")))
+    crawler_timeout_secs: float = field(default_factory=lambda: float(os.getenv("CRAWLER_TIMEOUT_SECS", "60")))
+    
+    # HTTP 連線池設定
+    http_timeout_secs: float = field(default_factory=lambda: float(os.getenv("HTTP_TIMEOUT_SECS", "30")))
+    http_max_connections_per_host: int = field(default_factory=lambda: int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10")))
+    http_keepalive_expiry_secs: float = field(default_factory=lambda: float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECS", "30")))
+    
     # 興趣關鍵字
     interest_keywords: List[str] = field(default_factory=lambda: [
         kw.strip().lower() for kw in 
@@ -28,6 +43,31 @@ class AppConfig:
     
     # 相關性閾值
     relevance_threshold: int = field(default_factory=lambda: int(os.getenv("RELEVANCE_THRESHOLD", "60")))
+    # 進入 LLM 相關性評分的候選數量
+    relevance_top_n: int = field(default_factory=lambda: int(os.getenv("RELEVANCE_TOP_N", "10")))
+    # 批次評分模式：多篇文章合併為單一請求
+    relevance_batch_mode: bool = field(default_factory=lambda: os.getenv("RELEVANCE_BATCH_MODE", "false").lower() == "true")
+    relevance_batch_token_budget: int = field(default_factory=lambda: int(os.getenv("RELEVANCE_BATCH_TOKEN_BUDGET", "4000")))
+    relevance_batch_max_size: int = field(default_factory=lambda: int(os.getenv("RELEVANCE_BATCH_MAX_SIZE", "20")))
+    
+    # LLM 閘道並行與限流設定
+    llm_max_in_flight: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_IN_FLIGHT", "4")))
+    llm_rate_per_sec: float = field(default_factory=lambda: float(os.getenv("LLM_RATE_PER_SEC", "2")))
+    llm_burst: int = field(default_factory=lambda: int(os.getenv("LLM_BURST", "4")))
+    llm_max_retries: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_RETRIES", "3")))
+    
+    # LLM 回應快取 (data/llm_cache.db)
+    llm_cache_enabled: bool = field(default_factory=lambda: os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true")
+    llm_cache_ttl_secs: int = field(default_factory=lambda: int(os.getenv("LLM_CACHE_TTL_SECS", str(7 * 86400))))
+    llm_cache_max_mb: int = field(default_factory=lambda: int(os.getenv("LLM_CACHE_MAX_MB", "64")))
+    
+    # RLM 深度分析任務佇列：同時執行的分析數與排隊上限
+    rlm_max_workers: int = field(default_factory=lambda: int(os.getenv("RLM_MAX_WORKERS", "2")))
+    rlm_max_queued_jobs: int = field(default_factory=lambda: int(os.getenv("RLM_MAX_QUEUED_JOBS", "20")))
+    
+    # 即時推送 (SSE)：跨行程寫入偵測間隔與連線保活間隔
+    event_watch_interval_secs: float = field(default_factory=lambda: float(os.getenv("EVENT_WATCH_INTERVAL_SECS", "2")))
+    sse_keepalive_secs: float = field(default_factory=lambda: float(os.getenv("SSE_KEEPALIVE_SECS", "15")))
     
     # 排程間隔 (分鐘)
     schedule_interval_mins: int = field(default_factory=lambda: int(os.getenv("SCHEDULE_INTERVAL_MINS", "120")))
@@ -1,15 +1,19 @@
-import feedparser
 import httpx
 from datetime import datetime
 from typing import List
 from .base import BaseCrawler
-from ..models import Article
+from ..models import Article, SourceConfig
+from ..database.http_cache import FeedValidatorCache
 
 class ArxivCrawler(BaseCrawler):
     """ArXiv 論文爬蟲"""
     
     API_URL = "https://export.arxiv.org/api/query"
 
+    def __init__(self, config: SourceConfig):
+        super().__init__(config)
+        self.validators = FeedValidatorCache()
+
     async def fetch(self) -> List[Article]:
         query = self.config.params.get("query", "cat:cs.AI")
         max_results = self.config.params.get("max_results", 10)
@@ -25,38 +29,43 @@ class ArxivCrawler(BaseCrawler):
         from loguru import logger
         logger.debug(f"🔍 請求 ArXiv API: {params}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(self.API_URL, params=params)
-                if response.status_code != 200:
-                    logger.error(f"❌ ArXiv API 回傳錯誤: {response.status_code}")
-                    return []
-                
-                feed = feedparser.parse(response.text)
-                logger.debug(f"✅ 成功解析 Feed, 共有 {len(feed.entries)} 條項目")
-                
-                articles = []
-                for entry in feed.entries:
-                    try:
-                        # 解析發布時間
-                        ts = entry.published.replace("Z", "+00:00")
-                        dt = datetime.fromisoformat(ts)
-                        
-                        article = Article(
-                            id=entry.id.split("/")[-1],
-                            title=self.clean_text(entry.title),
-                            authors=[a.name for a in entry.authors],
-                            summary=self.clean_text(entry.summary),
-                            url=entry.link,
-                            source="arxiv",
-                            published_date=dt
-                        )
-                        articles.append(article)
-                    except Exception as e:
-                        logger.warning(f"⚠️ 解析單條項目失敗: {e}")
-                        continue
-                        
-                return articles
-            except Exception as e:
-                logger.error(f"❌ 擷取 ArXiv 資料失敗: {e}")
+        feed_url = str(httpx.URL(self.API_URL, params=params))
+        client = self.get_client(self.API_URL)
+        try:
+            response = await client.get(feed_url, headers=await self.conditional_headers(feed_url))
+            if response.status_code == 304:
+                logger.debug("✅ ArXiv Feed 未變更 (304)，略過解析")
+                return []
+            if response.status_code != 200:
+                logger.error(f"❌ ArXiv API 回傳錯誤: {response.status_code}")
                 return []
+            
+            feed = await self.parse_feed(response.content)
+            logger.debug(f"✅ 成功解析 Feed, 共有 {len(feed.entries)} 條項目")
+            
+            self.partial_results = articles = []
+            for entry in feed.entries:
+                try:
+                    # 解析發布時間
+                    ts = entry.published.replace("Z", "+00:00")
+                    dt = datetime.fromisoformat(ts)
+                    
+                    article = Article(
+                        id=entry.id.split("/")[-1],
+                        title=self.clean_text(entry.title),
+                        authors=[a.name for a in entry.authors],
+                        summary=self.clean_text(entry.summary),
+                        url=entry.link,
+                        source="arxiv",
+                        published_date=dt
+                    )
+                    articles.append(article)
+                except Exception as e:
+                    logger.warning(f"⚠️ 解析單條項目失敗: {e}")
+                    continue
+            
+            self.validators.stage_from_headers(feed_url, response.headers)
+            return articles
+        except Exception as e:
+            logger.error(f"❌ 擷取 ArXiv 資料失敗: {e}")
+            return []
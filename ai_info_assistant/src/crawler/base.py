@@ -1,18 +1,68 @@
 import abc
-from typing import List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import feedparser
+import httpx
 from ..models import Article, SourceConfig
+from ..database.http_cache import FeedValidatorCache
+from ..http_client import get_http_client
+
+# Feed 解析專用的工作池，避免 XML 解析佔住事件迴圈
+_parse_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="feed-parse")
+
 
 class BaseCrawler(abc.ABC):
     """爬蟲基底類別"""
     
     def __init__(self, config: SourceConfig):
         self.config = config
+        # 抓取過程中逐步累積的結果，逾時時作為部分結果回傳
+        self.partial_results: List[Article] = []
+        # 支援條件式請求的爬蟲會設定此驗證器快取
+        self.validators: Optional[FeedValidatorCache] = None
 
     @abc.abstractmethod
     async def fetch(self) -> List[Article]:
         """抓取最新的文章列表"""
         pass
 
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """借用共享連線池中對應主機的 HTTP 客戶端 (不需自行關閉)"""
+        return get_http_client(url)
+
+    async def parse_feed(self, content: bytes) -> feedparser.FeedParserDict:
+        """在工作池中解析已下載的 RSS/Atom 內容"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_parse_pool, feedparser.parse, content)
+
+    async def conditional_headers(self, url: str) -> Dict[str, str]:
+        """在背景執行緒查詢 Feed 驗證器並產生條件式請求標頭，避免 SQLite 卡住事件迴圈"""
+        if self.validators is None:
+            return {}
+        return await asyncio.to_thread(self.validators.conditional_headers, url)
+
+    async def fetch_with_deadline(self, timeout: float) -> Tuple[List[Article], bool]:
+        """在期限內抓取，逾時則回傳已取得的部分結果
+
+        Returns:
+            (文章列表, 是否逾時)
+        """
+        try:
+            return await asyncio.wait_for(self.fetch(), timeout=timeout), False
+        except asyncio.TimeoutError:
+            return list(self.partial_results), True
+
+    async def commit_validators(self):
+        """本輪文章寫入資料庫後，於背景執行緒保存抓取時暫存的 Feed 驗證器"""
+        if self.validators is not None:
+            await asyncio.to_thread(self.validators.commit)
+
+    def discard_validators(self):
+        """捨棄暫存的 Feed 驗證器 (抓取逾時或失敗時)，下一輪將完整重抓"""
+        if self.validators is not None:
+            self.validators.discard()
+
     def clean_text(self, text: str) -> str:
         """基礎文字清洗"""
         if not text:
@@ -1,10 +1,17 @@
-import httpx
+import asyncio
+import time
 from datetime import datetime, timezone
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from .base import BaseCrawler
 from ..models import Article
+from ..config import config
+from ..http_client import get_with_retry
 from loguru import logger
 
+# 項目快取: story_id -> (過期時間, 項目內容)，跨排程執行保留，避免重複抓取仍在首頁的文章
+_item_cache: Dict[int, Tuple[float, dict]] = {}
+
+
 class HackerNewsCrawler(BaseCrawler):
     """Hacker News 爬蟲"""
     
@@ -15,49 +22,84 @@ class HackerNewsCrawler(BaseCrawler):
         
         logger.debug(f"🔍 請求 Hacker News Top Stories (前 {max_items} 則)")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                # 1. 獲取熱門文章 ID 列表
-                response = await client.get(f"{self.BASE_URL}/topstories.json")
-                if response.status_code != 200:
-                    logger.error(f"❌ HN API 回傳錯誤: {response.status_code}")
-                    return []
-                
-                story_ids = response.json()[:max_items]
-                logger.debug(f"✅ 獲得 {len(story_ids)} 則熱門文章 ID")
-                
-                # 2. 逐一獲取文章詳情
-                articles = []
-                for story_id in story_ids:
-                    try:
-                        item_resp = await client.get(f"{self.BASE_URL}/item/{story_id}.json")
-                        if item_resp.status_code != 200:
-                            continue
-                        
-                        item = item_resp.json()
-                        if not item or item.get("type") != "story":
-                            continue
-                        
-                        # 解析時間 (Unix timestamp)
-                        ts = item.get("time", 0)
-                        dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-                        
-                        article = Article(
-                            id=f"hn-{story_id}",
-                            title=self.clean_text(item.get("title", "")),
-                            authors=[item.get("by", "Unknown")],
-                            summary=f"HN 熱門話題 (Score: {item.get('score', 0)}, Comments: {item.get('descendants', 0)})",
-                            url=item.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
-                            source="hn",
-                            published_date=dt
-                        )
-                        articles.append(article)
-                    except Exception as e:
-                        logger.warning(f"⚠️ 解析 HN 項目 {story_id} 失敗: {e}")
-                        continue
-                
-                logger.debug(f"✅ 成功解析 {len(articles)} 則 HN 文章")
-                return articles
-            except Exception as e:
-                logger.error(f"❌ 擷取 HN 資料失敗: {e}")
+        client = self.get_client(self.BASE_URL)
+        try:
+            # 1. 獲取熱門文章 ID 列表
+            response = await client.get(f"{self.BASE_URL}/topstories.json")
+            if response.status_code != 200:
+                logger.error(f"❌ HN API 回傳錯誤: {response.status_code}")
                 return []
+            
+            story_ids = response.json()[:max_items]
+            logger.debug(f"✅ 獲得 {len(story_ids)} 則熱門文章 ID")
+            
+            # 2. 並行獲取文章詳情 (以 semaphore 限制同時請求數)
+            self._evict_expired()
+            semaphore = asyncio.Semaphore(max(1, config.hn_concurrency))
+            self.partial_results = articles = []
+            
+            async def fetch_one(story_id: int) -> Optional[Article]:
+                async with semaphore:
+                    article = await self._fetch_item(story_id)
+                if article:
+                    articles.append(article)
+                return article
+            
+            # 以原本的熱門順序回傳
+            results = await asyncio.gather(*(fetch_one(sid) for sid in story_ids))
+            articles = [a for a in results if a]
+            
+            logger.debug(f"✅ 成功解析 {len(articles)} 則 HN 文章")
+            return articles
+        except Exception as e:
+            logger.error(f"❌ 擷取 HN 資料失敗: {e}")
+            return []
+
+    async def _fetch_item(self, story_id: int) -> Optional[Article]:
+        """抓取單一項目 (優先使用快取)，失敗時回傳 None"""
+        try:
+            item = self._get_cached(story_id)
+            if item is None:
+                item_resp = await get_with_retry(
+                    f"{self.BASE_URL}/item/{story_id}.json",
+                    retries=config.hn_item_retries,
+                    timeout=config.hn_item_timeout_secs,
+                )
+                if item_resp.status_code != 200:
+                    return None
+                item = item_resp.json()
+                if item:
+                    _item_cache[story_id] = (time.monotonic() + config.hn_item_cache_ttl_secs, item)
+            
+            if not item or item.get("type") != "story":
+                return None
+            
+            # 解析時間 (Unix timestamp)
+            ts = item.get("time", 0)
+            dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+            
+            return Article(
+                id=f"hn-{story_id}",
+                title=self.clean_text(item.get("title", "")),
+                authors=[item.get("by", "Unknown")],
+                summary=f"HN 熱門話題 (Score: {item.get('score', 0)}, Comments: {item.get('descendants', 0)})",
+                url=item.get("url", f"https://news.ycombinator.com/item?id={story_id}"),
+                source="hn",
+                published_date=dt
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 解析 HN 項目 {story_id} 失敗: {e}")
+            return None
+
+    def _get_cached(self, story_id: int) -> Optional[dict]:
+        """讀取未過期的快取項目"""
+        entry = _item_cache.get(story_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _evict_expired(self):
+        """清除過期的快取項目"""
+        now = time.monotonic()
+        for story_id in [sid for sid, (expires, _) in _item_cache.items() if expires <= now]:
+            del _item_cache[story_id]
@@ -2,14 +2,17 @@
 Reddit RSS 爬蟲
 ================
 使用 Reddit 公開 RSS Feed 抓取 subreddit 熱門文章。
-不需要 API 認證，使用 feedparser 解析 RSS。
+不需要 API 認證，透過共享的非同步 HTTP 連線池下載，
+再於工作池中以 feedparser 解析 RSS，避免阻塞事件迴圈。
 """
 
+import asyncio
 import feedparser
 from datetime import datetime, timezone
-from typing import List
+from typing import AsyncIterator, List, Tuple
 from .base import BaseCrawler
-from ..models import Article
+from ..models import Article, SourceConfig
+from ..database.http_cache import FeedValidatorCache
 from loguru import logger
 
 
@@ -18,59 +21,99 @@ class RedditCrawler(BaseCrawler):
     
     RSS_TEMPLATE = "https://www.reddit.com/r/{subreddit}/{sort}.rss"
 
+    def __init__(self, config: SourceConfig):
+        super().__init__(config)
+        self.validators = FeedValidatorCache()
+
     async def fetch(self) -> List[Article]:
         subreddits = self.config.params.get("subreddits", ["MachineLearning"])
+        
+        self.partial_results = articles = []
+        async for subreddit, sub_articles in self.stream():
+            articles.extend(sub_articles)
+        
+        logger.debug(f"✅ Reddit 共取得 {len(articles)} 篇文章 ({len(subreddits)} subreddits)")
+        return articles
+
+    async def stream(self) -> AsyncIterator[Tuple[str, List[Article]]]:
+        """同時抓取所有 subreddits，依完成順序逐一產出 (subreddit, 文章列表)"""
+        subreddits = self.config.params.get("subreddits", ["MachineLearning"])
         max_items = self.config.params.get("max_items", 10)
         sort = self.config.params.get("sort", "hot")  # hot, new, top
         
         logger.debug(f"🔍 請求 Reddit RSS ({len(subreddits)} subreddits, sort={sort})")
         
-        articles = []
         items_per_sub = max(1, max_items // len(subreddits))
         
-        for subreddit in subreddits:
-            try:
-                url = self.RSS_TEMPLATE.format(subreddit=subreddit, sort=sort)
-                feed = feedparser.parse(url)
-                
-                if feed.bozo and not feed.entries:
-                    logger.warning(f"⚠️ Reddit RSS 解析失敗: r/{subreddit}")
+        async def fetch_one(subreddit: str) -> Tuple[str, List[Article]]:
+            return subreddit, await self._fetch_subreddit(subreddit, sort, items_per_sub)
+        
+        tasks = [asyncio.create_task(fetch_one(sub)) for sub in subreddits]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 逾時或呼叫端提前結束時取消未完成的抓取，避免其在驗證器捨棄後仍暫存 ETag
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch_subreddit(self, subreddit: str, sort: str, limit: int) -> List[Article]:
+        """非同步下載單一 subreddit 的 RSS，並在工作池中解析"""
+        articles = []
+        try:
+            url = self.RSS_TEMPLATE.format(subreddit=subreddit, sort=sort)
+            headers = {"User-Agent": feedparser.USER_AGENT}
+            headers.update(await self.conditional_headers(url))
+            
+            client = self.get_client(url)
+            response = await client.get(url, headers=headers, follow_redirects=True)
+            
+            if response.status_code == 304:
+                logger.debug(f"✅ r/{subreddit}: Feed 未變更 (304)，略過")
+                return []
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Reddit RSS 回傳錯誤: r/{subreddit} ({response.status_code})")
+                return []
+            
+            feed = await self.parse_feed(response.content)
+            
+            if feed.bozo and not feed.entries:
+                logger.warning(f"⚠️ Reddit RSS 解析失敗: r/{subreddit}")
+                return []
+            
+            for entry in feed.entries[:limit]:
+                try:
+                    # 解析發布時間
+                    published = entry.get("published_parsed") or entry.get("updated_parsed")
+                    if published:
+                        dt = datetime(*published[:6], tzinfo=timezone.utc)
+                    else:
+                        dt = datetime.now(timezone.utc)
+                    
+                    # 從 entry.id 取得 Reddit post ID
+                    entry_id = entry.get("id", entry.get("link", ""))
+                    post_id = entry_id.split("/")[-2] if "/comments/" in entry_id else entry_id[-8:]
+                    
+                    article = Article(
+                        id=f"reddit-{subreddit.lower()}-{post_id}",
+                        title=self.clean_text(entry.get("title", "")),
+                        authors=[entry.get("author", f"r/{subreddit}")],
+                        summary=self._extract_summary(entry),
+                        url=entry.get("link", ""),
+                        source="reddit",
+                        published_date=dt
+                    )
+                    articles.append(article)
+                except Exception as e:
+                    logger.warning(f"⚠️ 解析 Reddit 項目失敗: {e}")
                     continue
-                
-                for entry in feed.entries[:items_per_sub]:
-                    try:
-                        # 解析發布時間
-                        published = entry.get("published_parsed") or entry.get("updated_parsed")
-                        if published:
-                            dt = datetime(*published[:6], tzinfo=timezone.utc)
-                        else:
-                            dt = datetime.now(timezone.utc)
-                        
-                        # 從 entry.id 取得 Reddit post ID
-                        entry_id = entry.get("id", entry.get("link", ""))
-                        post_id = entry_id.split("/")[-2] if "/comments/" in entry_id else entry_id[-8:]
-                        
-                        article = Article(
-                            id=f"reddit-{subreddit.lower()}-{post_id}",
-                            title=self.clean_text(entry.get("title", "")),
-                            authors=[entry.get("author", f"r/{subreddit}")],
-                            summary=self._extract_summary(entry),
-                            url=entry.get("link", ""),
-                            source="reddit",
-                            published_date=dt
-                        )
-                        articles.append(article)
-                    except Exception as e:
-                        logger.warning(f"⚠️ 解析 Reddit 項目失敗: {e}")
-                        continue
-                
-                logger.debug(f"✅ r/{subreddit}: 取得 {min(len(feed.entries), items_per_sub)} 篇")
-                
-            except Exception as e:
-                logger.error(f"❌ 抓取 r/{subreddit} 失敗: {e}")
-                continue
+            
+            self.validators.stage_from_headers(url, response.headers)
+            logger.debug(f"✅ r/{subreddit}: 取得 {len(articles)} 篇")
+        except Exception as e:
+            logger.error(f"❌ 抓取 r/{subreddit} 失敗: {e}")
         
-        logger.debug(f"✅ Reddit 共取得 {len(articles)} 篇文章")
         return articles
     
     def _extract_summary(self, entry) -> str:
@@ -0,0 +1,88 @@
+import sqlite3
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Tuple
+from loguru import logger
+
+
+class FeedValidatorCache:
+    """HTTP 驗證器快取 (ETag / Last-Modified)
+
+    為每個 Feed URL 保存上次回應的驗證器，下次抓取時送出條件式請求；
+    伺服器回傳 304 代表內容未變，爬蟲即可略過下載與解析。
+
+    爬蟲抓取時只暫存驗證器，待流程將本輪文章寫入資料庫後才呼叫 commit()；
+    若評分、提煉或寫入失敗，下一輪不會收到 304 而遺失這批文章。
+
+    查詢與保存皆為同步 SQLite 操作，爬蟲應透過 asyncio.to_thread 呼叫；
+    資料表於首次存取時才建立，建構時不碰資料庫。
+    """
+    
+    def __init__(self, db_path: str = "data/assistant.db"):
+        self.db_path = db_path
+        self._pending: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._initialized = False
+
+    def _init_db(self):
+        """初始化資料表 (僅首次存取時執行)"""
+        if self._initialized:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated_at TEXT
+                )
+            """)
+            conn.commit()
+        self._initialized = True
+
+    def get(self, url: str) -> Dict[str, Optional[str]]:
+        """取得指定 URL 的驗證器 {"etag": ..., "last_modified": ...}"""
+        self._init_db()
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified FROM feed_validators WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return {"etag": None, "last_modified": None}
+        return {"etag": row[0], "last_modified": row[1]}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """產生條件式請求標頭 (If-None-Match / If-Modified-Since)"""
+        validators = self.get(url)
+        headers = {}
+        if validators["etag"]:
+            headers["If-None-Match"] = validators["etag"]
+        if validators["last_modified"]:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def save(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """保存驗證器；兩者皆無時不寫入"""
+        if not etag and not last_modified:
+            return
+        self._init_db()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO feed_validators (url, etag, last_modified, updated_at)
+                VALUES (?, ?, ?, ?)
+            """, (url, etag, last_modified, datetime.now().isoformat()))
+            conn.commit()
+
+    def stage_from_headers(self, url: str, headers: Mapping[str, str]):
+        """暫存 HTTP 回應標頭中的驗證器，待 commit() 時才保存"""
+        self._pending[url] = (headers.get("etag"), headers.get("last-modified"))
+
+    def commit(self):
+        """保存所有暫存的驗證器 (應於本輪文章已寫入資料庫後呼叫)"""
+        pending, self._pending = self._pending, {}
+        for url, (etag, last_modified) in pending.items():
+            self.save(url, etag, last_modified)
+        if pending:
+            logger.debug(f"🏷️ 更新 {len(pending)} 個 Feed 驗證器")
+
+    def discard(self):
+        """捨棄暫存的驗證器 (流程失敗或逾時時呼叫，下一輪將完整重抓)"""
+        self._pending.clear()
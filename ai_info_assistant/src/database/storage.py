@@ -1,20 +1,77 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import List, Set
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
 from ..models import Article
 from loguru import logger
 
 class DatabaseManager:
-    """SQLite 資料庫管理器"""
+    """SQLite 資料庫管理器
+
+    每個實例持有一條長期連線 (以鎖保護，可跨執行緒使用)，並啟用 WAL 模式，
+    讓 Web 端讀取不會被排程器寫入阻塞。
+    """
+    
+    # 連線調校參數
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",   # WAL 模式下 NORMAL 已可保證資料庫一致性
+        "PRAGMA cache_size=-20000",    # 約 20 MB 頁面快取
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
+    
+    # Web 列表可排序的欄位 (對應 src/web/app.py 的 SORT_OPTIONS)
+    SORT_COLUMNS = ("processed_at", "trust_score", "published_date")
     
     def __init__(self, db_path: str = "data/assistant.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()
+        # cached_statements: 重複的查詢字串直接重用已編譯的 prepared statement
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for pragma in self.PRAGMAS:
+            self._conn.execute(pragma)
         self._init_db()
 
+    def close(self):
+        """關閉連線"""
+        with self._lock:
+            self._conn.close()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """執行唯讀查詢，回傳可用欄位名稱存取的列"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(sql, params).fetchall()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """執行唯讀查詢，回傳第一列 (無結果時為 None)"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """執行單一寫入語句並提交，回傳影響列數"""
+        with self._lock, self._conn as conn:
+            rowcount = conn.execute(sql, params).rowcount
+            self._bump_generation(conn)
+            return rowcount
+
+    def _bump_generation(self, conn: sqlite3.Connection):
+        """遞增寫入世代 (與資料寫入同一交易)"""
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'write_generation'")
+
+    def get_write_generation(self) -> int:
+        """目前的寫入世代 (單一主鍵查詢)"""
+        row = self.fetchone("SELECT value FROM meta WHERE key = 'write_generation'")
+        return row[0] if row else 0
+
     def _init_db(self):
         """初始化資料表"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS articles (
@@ -29,7 +86,8 @@ class DatabaseManager:
                     published_date TEXT,
                     trust_score REAL,
                     processed_at TEXT,
-                    rlm_analysis TEXT
+                    rlm_analysis TEXT,
+                    doc_id INTEGER
                 )
             """)
             # 嘗試新增欄位（如果不存在）
@@ -37,44 +95,240 @@ class DatabaseManager:
                 cursor.execute("ALTER TABLE articles ADD COLUMN rlm_analysis TEXT")
             except sqlite3.OperationalError:
                 pass  # 欄位已存在
-            conn.commit()
+            # 寫入世代：每次寫入遞增，跨行程 (排程器 / Web) 的快取以此判斷是否失效
+            cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('write_generation', 0)")
+            # 列表排序索引：每個排序欄位各建一組 (全部 / 依來源篩選)，
+            # 以 id 作為同值時的決勝欄位，供 keyset 分頁直接沿索引掃描
+            for col in self.SORT_COLUMNS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_articles_{col} "
+                    f"ON articles ({col} DESC, id DESC)"
+                )
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_articles_source_{col} "
+                    f"ON articles (source, {col} DESC, id DESC)"
+                )
+            self._init_fts(cursor)
+            
+            # RLM 深度分析任務 (狀態：queued / running / done / failed / cancelled)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    article_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    created_at TEXT,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            # 同一篇文章同時只能有一個進行中的任務
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_active
+                ON analysis_jobs (article_id) WHERE status IN ('queued', 'running')
+            """)
+
+    # 全文檢索欄位 (依序對應 bm25 權重)
+    FTS_COLUMNS = ("title", "summary", "ai_summary", "tags", "rlm_analysis")
+
+    # 全文索引結構版本 (變更索引定義時遞增，舊版索引會在啟動時重建)
+    FTS_SCHEMA_VERSION = 2
+
+    def _init_fts(self, cursor: sqlite3.Cursor):
+        """建立 FTS5 全文索引 (external content 指向 articles，由觸發器同步)
+
+        使用 trigram 分詞器，中文摘要與英文標題都能以任意子字串 (至少 3 字元) 檢索。
+        索引以 doc_id 欄位 (寫入時分配、唯一且不隨 VACUUM 改變) 對應文章；
+        articles 以 TEXT 為主鍵，其隱含 rowid 可能在 VACUUM 後重新編號。
+        """
+        row = cursor.execute("SELECT value FROM meta WHERE key = 'fts_schema'").fetchone()
+        if (row[0] if row else 0) < self.FTS_SCHEMA_VERSION:
+            self._migrate_fts(cursor)
+        
+        cols = ", ".join(self.FTS_COLUMNS)
+        new_cols = ", ".join(f"new.{c}" for c in self.FTS_COLUMNS)
+        old_cols = ", ".join(f"old.{c}" for c in self.FTS_COLUMNS)
+        
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                {cols}, content='articles', content_rowid='doc_id', tokenize='trigram'
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, {cols}) VALUES (new.doc_id, {new_cols});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, {cols}) VALUES ('delete', old.doc_id, {old_cols});
+            END
+        """)
+        # upsert 的 DO UPDATE 與 RLM 分析的 UPDATE 都會走這個觸發器
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, {cols}) VALUES ('delete', old.doc_id, {old_cols});
+                INSERT INTO articles_fts (rowid, {cols}) VALUES (new.doc_id, {new_cols});
+            END
+        """)
+        if (row[0] if row else 0) < self.FTS_SCHEMA_VERSION:
+            self.rebuild_fts(cursor)
+            cursor.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_schema', ?)",
+                (self.FTS_SCHEMA_VERSION,)
+            )
+
+    def _migrate_fts(self, cursor: sqlite3.Cursor):
+        """移除舊版索引，補上 doc_id 並把標籤改存為未跳脫的 UTF-8 JSON (之後由呼叫端重建索引)"""
+        for trigger in ("articles_fts_ai", "articles_fts_ad", "articles_fts_au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS articles_fts")
+        
+        columns = {r[1] for r in cursor.execute("PRAGMA table_info(articles)")}
+        if "doc_id" not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN doc_id INTEGER")
+        # 遷移當下的 rowid 互不重複，可直接作為既有文章的 doc_id
+        cursor.execute("UPDATE articles SET doc_id = rowid WHERE doc_id IS NULL")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_doc_id ON articles (doc_id)")
+        
+        # 舊資料以 ensure_ascii 寫入標籤 (\uXXXX)，中文標籤無法被全文檢索
+        escaped = cursor.execute("SELECT id, tags FROM articles WHERE tags LIKE '%\\u%'").fetchall()
+        cursor.executemany(
+            "UPDATE articles SET tags = ? WHERE id = ?",
+            [(json.dumps(json.loads(tags), ensure_ascii=False), article_id) for article_id, tags in escaped]
+        )
+        logger.info(f"🔄 全文索引遷移：補上 doc_id，轉換 {len(escaped)} 篇文章的標籤編碼")
+
+    def rebuild_fts(self, cursor: sqlite3.Cursor = None):
+        """從 articles 重建全文索引 (首次建立或索引毀損時使用)"""
+        with self._lock:
+            (cursor or self._conn).execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            if cursor is None:
+                self._conn.commit()
+        logger.info("🔎 全文索引已重建")
+
+    # 單一 IN 查詢的參數上限 (低於 SQLite 預設的 999 變數限制)
+    ID_LOOKUP_CHUNK = 500
+
+    def get_existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        """回傳候選 ID 中已存在於資料庫者 (以主鍵批次查詢，成本與候選數量成正比)"""
+        candidates = list(dict.fromkeys(ids))
+        existing = set()
+        with self._lock:
+            cursor = self._conn.cursor()
+            for i in range(0, len(candidates), self.ID_LOOKUP_CHUNK):
+                chunk = candidates[i:i + self.ID_LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT id FROM articles WHERE id IN ({placeholders})", chunk)
+                existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    def count_articles(self) -> int:
+        """文章總數"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
 
     def get_processed_ids(self) -> Set[str]:
-        """獲取所有已處理過的文章 ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """獲取所有已處理過的文章 ID (會載入全部歷史，去重請改用 get_existing_ids)"""
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute("SELECT id FROM articles")
             return {row[0] for row in cursor.fetchall()}
 
     def save_articles(self, articles: List[Article]):
-        """批量保存文章"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            for art in articles:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO articles 
-                    (id, title, authors, summary, ai_summary, tags, url, source, published_date, trust_score, processed_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    art.id,
-                    art.title,
-                    ",".join(art.authors),
-                    art.summary,
-                    art.ai_summary,
-                    json.dumps(art.tags),
-                    art.url,
-                    art.source,
-                    art.published_date.isoformat(),
-                    art.trust_score,
-                    datetime.now().isoformat()
-                ))
-            conn.commit()
-            logger.info(f"💾 成功保存 {len(articles)} 篇文章到資料庫")
+        """批量保存文章 (單一交易內以 executemany 執行 upsert，保留既有的 RLM 分析)"""
+        processed_at = datetime.now().isoformat()
+        rows = [
+            (
+                art.id,
+                art.title,
+                ",".join(art.authors),
+                art.summary,
+                art.ai_summary,
+                json.dumps(art.tags, ensure_ascii=False),  # 以原文存入，全文索引才能檢索中文標籤
+                art.url,
+                art.source,
+                art.published_date.isoformat(),
+                art.trust_score,
+                processed_at
+            )
+            for art in articles
+        ]
+        with self._lock, self._conn as conn:
+            conn.executemany("""
+                INSERT INTO articles 
+                (id, title, authors, summary, ai_summary, tags, url, source, published_date, trust_score, processed_at, doc_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(doc_id), 0) + 1 FROM articles))
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    summary = excluded.summary,
+                    ai_summary = excluded.ai_summary,
+                    tags = excluded.tags,
+                    url = excluded.url,
+                    source = excluded.source,
+                    published_date = excluded.published_date,
+                    trust_score = excluded.trust_score,
+                    processed_at = excluded.processed_at
+            """, rows)
+            self._bump_generation(conn)
+        logger.info(f"💾 成功保存 {len(articles)} 篇文章到資料庫")
 
     def delete_article(self, article_id: str):
         """刪除指定文章"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM articles WHERE id = ?", (article_id,))
-            conn.commit()
-            logger.info(f"🗑️ 已從資料庫刪除文章: {article_id}")
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+            self._bump_generation(conn)
+        logger.info(f"🗑️ 已從資料庫刪除文章: {article_id}")
+
+    def create_analysis_job(self, article_id: str) -> Tuple[dict, bool]:
+        """建立分析任務；該文章已有進行中的任務時直接回傳既有任務。回傳 (任務, 是否新建)"""
+        active_sql = "SELECT * FROM analysis_jobs WHERE article_id = ? AND status IN ('queued', 'running')"
+        with self._lock:
+            row = self.fetchone(active_sql, (article_id,))
+            if row:
+                return dict(row), False
+            try:
+                with self._conn as conn:
+                    cursor = conn.execute(
+                        "INSERT INTO analysis_jobs (article_id, status, created_at) VALUES (?, 'queued', ?)",
+                        (article_id, datetime.now().isoformat())
+                    )
+                return self.get_analysis_job(cursor.lastrowid), True
+            except sqlite3.IntegrityError:
+                # 其他行程剛建立了同一篇文章的任務 (部分唯一索引保證不重複)
+                return dict(self.fetchone(active_sql, (article_id,))), False
+
+    def get_analysis_job(self, job_id: int) -> Optional[dict]:
+        """取得任務狀態"""
+        row = self.fetchone("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+        return dict(row) if row else None
+
+    def count_active_analysis_jobs(self) -> int:
+        """排隊中與執行中的任務數"""
+        row = self.fetchone("SELECT COUNT(*) FROM analysis_jobs WHERE status IN ('queued', 'running')")
+        return row[0]
+
+    def update_analysis_job(self, job_id: int, status: str, error: str = None, only_if: Sequence[str] = None) -> bool:
+        """更新任務狀態；指定 only_if 時只在目前狀態符合時更新 (回傳是否有更新)"""
+        now = datetime.now().isoformat()
+        sql = """
+            UPDATE analysis_jobs SET status = ?, error = ?,
+                started_at = CASE WHEN ? = 'running' THEN ? ELSE started_at END,
+                finished_at = CASE WHEN ? IN ('queued', 'running') THEN NULL ELSE ? END
+            WHERE id = ?
+        """
+        params = [status, error, status, now, status, now, job_id]
+        if only_if:
+            sql += f" AND status IN ({','.join('?' * len(only_if))})"
+            params.extend(only_if)
+        with self._lock, self._conn as conn:
+            return conn.execute(sql, params).rowcount == 1
+
+    def recover_analysis_jobs(self) -> List[int]:
+        """重新啟動時：把中斷的執行中任務改回排隊，回傳所有待執行任務 ID (依建立順序)"""
+        with self._lock, self._conn as conn:
+            conn.execute("UPDATE analysis_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            rows = conn.execute("SELECT id FROM analysis_jobs WHERE status = 'queued' ORDER BY id").fetchall()
+        return [row[0] for row in rows]
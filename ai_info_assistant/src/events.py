@@ -0,0 +1,56 @@
+"""
+行程內事件匯流排
+================
+以 asyncio.Queue 實作的簡易 pub/sub：排程流程與 RLM 分析任務發布事件，
+Web 端的 SSE 連線各自訂閱，取代前端輪詢資料庫。
+
+事件類型：
+    article_saved       新文章已寫入資料庫
+    analysis_progress   RLM 分析狀態更新 (例如 started)
+    analysis_done       RLM 分析完成 (含結果或錯誤)
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Set, Tuple
+
+from loguru import logger
+
+Event = Tuple[str, dict]
+
+
+class EventBus:
+    """行程內事件匯流排 (每個訂閱者一個有界佇列)"""
+    
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator["asyncio.Queue[Event]"]:
+        """訂閱事件，離開 context 時自動取消訂閱"""
+        queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict):
+        """發布事件 (不阻塞；訂閱者佇列已滿時捨棄其最舊的事件)"""
+        for queue in list(self._subscribers):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                logger.debug(f"📭 事件佇列已滿，捨棄最舊事件 ({event})")
+            queue.put_nowait((event, data))
+
+
+# 全域事件匯流排
+event_bus = EventBus()
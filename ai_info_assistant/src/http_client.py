@@ -0,0 +1,100 @@
+"""
+共享 HTTP 連線池
+================
+整個行程共用的 httpx.AsyncClient 管理器，讓爬蟲與 LLM 客戶端重複使用
+已建立的 TCP/TLS 連線 (keep-alive)，並依主機分別限制連線數。
+透過 httpx[http2] 相依套件啟用 HTTP/2；若環境缺少 `h2` 則退回 HTTP/1.1。
+"""
+
+import asyncio
+import random
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from .config import config
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientManager:
+    """依主機管理共享的 httpx.AsyncClient，每個主機各自擁有連線池與連線上限"""
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """取得指定 URL 所屬主機的共享客戶端"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 連線綁定於事件迴圈，換了迴圈 (例如多次 asyncio.run) 就必須重建
+            self._clients = {}
+            self._loop = loop
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=config.http_timeout_secs,
+                limits=httpx.Limits(
+                    max_connections=config.http_max_connections_per_host,
+                    max_keepalive_connections=config.http_max_connections_per_host,
+                    keepalive_expiry=config.http_keepalive_expiry_secs,
+                ),
+            )
+            self._clients[key] = client
+        return client
+
+    async def aclose(self):
+        """關閉所有客戶端與其連線"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+        if clients:
+            logger.debug(f"🔌 已關閉 {len(clients)} 個 HTTP 連線池")
+
+
+# 全局共享實例
+http_clients = HTTPClientManager()
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """取得共享的 HTTP 客戶端"""
+    return http_clients.get(url)
+
+
+# 值得重試的 HTTP 狀態碼 (節流與暫時性伺服器錯誤)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+async def get_with_retry(url: str, retries: int = 2, backoff: float = 0.5, **kwargs) -> httpx.Response:
+    """以共享客戶端發送 GET，遇到連線錯誤或暫時性狀態碼時以隨機抖動的指數退避重試
+
+    其餘參數 (params、headers、timeout 等) 直接傳給 httpx。
+    """
+    client = get_http_client(url)
+    for attempt in range(retries + 1):
+        try:
+            response = await client.get(url, **kwargs)
+            if response.status_code not in RETRYABLE_STATUS or attempt == retries:
+                return response
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        # Full jitter: 避免大量請求同時重試
+        await asyncio.sleep(random.uniform(0, backoff * (2 ** attempt)))
+    raise RuntimeError("unreachable")
+
+
+async def close_http_clients():
+    """關閉共享的 HTTP 客戶端 (排程器結束與 Web 應用關閉時呼叫)"""
+    await http_clients.aclose()
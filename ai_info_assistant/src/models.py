@@ -23,4 +23,5 @@ class SourceConfig(BaseModel):
     name: str
     enabled: bool = True
     update_interval_hours: int = 24
+    timeout_secs: Optional[float] = None  # 單一來源的抓取期限，None 則使用全域設定
     params: dict = Field(default_factory=dict)
@@ -0,0 +1,142 @@
+"""
+RLM 深度分析任務佇列
+====================
+RLM 分析是多輪迭代的長時間任務。所有分析請求先寫入 SQLite 的 analysis_jobs 表，
+再由固定數量的 worker 依序執行 (RLM 在專用的同尺寸執行緒池上運行)：
+
+- 同一篇文章同時只會有一個排隊或執行中的任務 (重複點擊直接回傳既有任務)
+- 排隊數量有上限，超過時拒絕新任務
+- 可取消排隊中或執行中的任務
+- 服務重啟時，中斷的任務會重新排隊
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from ..database.async_db import AsyncDatabaseManager
+from ..events import event_bus
+
+
+class QueueFullError(Exception):
+    """排隊任務已達上限"""
+
+
+class AnalysisJobQueue:
+    """以 SQLite 持久化狀態的 RLM 分析任務佇列 (固定大小 worker pool)"""
+
+    def __init__(self, db: AsyncDatabaseManager, workers: int = 2, max_queued: int = 20):
+        self.db = db
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self._queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[int, asyncio.Task] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        """恢復未完成的任務並啟動 worker"""
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rlm")
+        pending = await self.db.recover_analysis_jobs()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"♻️ 恢復 {len(pending)} 個未完成的 RLM 分析任務")
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self):
+        """停止 worker；執行中的任務保留 running 狀態，下次啟動時重新排隊"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor:
+            # 執行中的 RLM 呼叫無法中斷，不等待其結束
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, article_id: str) -> Tuple[dict, bool]:
+        """提交分析任務，回傳 (任務, 是否新建)；排隊已滿時拋出 QueueFullError"""
+        if await self.db.count_active_analysis_jobs() >= self.max_queued:
+            raise QueueFullError(f"已有 {self.max_queued} 個分析任務在排隊")
+        job, created = await self.db.create_analysis_job(article_id)
+        if created:
+            self._queue.put_nowait(job["id"])
+            event_bus.publish("analysis_progress", {"id": article_id, "job_id": job["id"], "status": "queued"})
+            logger.info(f"📝 RLM 分析任務 #{job['id']} 已排隊: {article_id}")
+        return job, created
+
+    async def cancel(self, job_id: int) -> bool:
+        """取消排隊中或執行中的任務 (執行中的 RLM 呼叫會跑完，但結果不會寫入)"""
+        job = await self.db.get_analysis_job(job_id)
+        if not job:
+            return False
+        cancelled = await self.db.update_analysis_job(job_id, "cancelled", only_if=("queued", "running"))
+        if not cancelled:
+            return False
+
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+        event_bus.publish("analysis_done", {"id": job["article_id"], "job_id": job_id, "error": "cancelled"})
+        logger.info(f"🛑 RLM 分析任務 #{job_id} 已取消")
+        return True
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ RLM worker {index} 處理任務 #{job_id} 失敗: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: int):
+        # 取消與執行的競爭以條件更新決定：只有仍在排隊的任務會被執行
+        if not await self.db.update_analysis_job(job_id, "running", only_if=("queued",)):
+            return
+        job = await self.db.get_analysis_job(job_id)
+        article_id = job["article_id"]
+
+        row = await self.db.fetchone("SELECT title, summary, url FROM articles WHERE id = ?", (article_id,))
+        if not row:
+            await self.db.update_analysis_job(job_id, "failed", "Article not found", only_if=("running",))
+            event_bus.publish("analysis_done", {"id": article_id, "job_id": job_id, "error": "Article not found"})
+            return
+
+        event_bus.publish("analysis_progress", {"id": article_id, "job_id": job_id, "status": "running"})
+
+        async def analyze() -> str:
+            # 分析器初始化失敗 (例如 RLM 未安裝) 也視為任務失敗
+            from .rlm_analyzer import get_analyzer
+            return await get_analyzer().analyze(row["title"], row["summary"] or "", row["url"], executor=self._executor)
+
+        task = asyncio.create_task(analyze())
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if task.cancelled() and asyncio.current_task().cancelling() == 0:
+                return  # 任務被使用者取消，狀態已在 cancel() 更新
+            raise
+        except Exception as e:
+            await self.db.update_analysis_job(job_id, "failed", str(e), only_if=("running",))
+            event_bus.publish("analysis_done", {"id": article_id, "job_id": job_id, "error": str(e)})
+            return
+        finally:
+            self._running.pop(job_id, None)
+
+        # 先寫入結果再標記完成 (中途重啟時任務會重新執行)；執行期間被取消的任務不寫入
+        saved = await self.db.execute("""
+            UPDATE articles SET rlm_analysis = ?
+            WHERE id = ? AND EXISTS (SELECT 1 FROM analysis_jobs WHERE id = ? AND status = 'running')
+        """, (result, article_id, job_id))
+        if not saved or not await self.db.update_analysis_job(job_id, "done", only_if=("running",)):
+            return
+        event_bus.publish("analysis_done", {"id": article_id, "job_id": job_id, "analysis": result})
+        logger.success(f"✅ RLM 分析任務 #{job_id} 完成")
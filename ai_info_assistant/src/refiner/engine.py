@@ -1,6 +1,8 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+import asyncio
 import json
 from ..models import Article
+from ..config import config
 from .llm import LLMClient
 from loguru import logger
 
@@ -33,17 +35,10 @@ class RefinerEngine:
 }}
 """
         
-        response = await self.llm.chat_completion(system_prompt, user_prompt)
+        response = await self.llm.chat_completion(system_prompt, user_prompt, validate=self._parse_response)
         if response:
             try:
-                # 簡單清理可能的 Markdown 標籤
-                clean_json = response.strip()
-                if clean_json.startswith("```json"):
-                    clean_json = clean_json[7:-3].strip()
-                elif clean_json.startswith("```"):
-                    clean_json = clean_json[3:-3].strip()
-                
-                data = json.loads(clean_json)
+                data = self._parse_response(response)
                 article.ai_summary = data.get("ai_summary", article.ai_summary)
                 article.tags = data.get("tags", article.tags)
                 logger.success(f"✅ 提煉完成: {article.title}")
@@ -52,10 +47,47 @@ class RefinerEngine:
         
         return article
 
+    @staticmethod
+    def _parse_response(response: str) -> dict:
+        """解析提煉結果 JSON (格式不符時拋出例外，該回應不會寫入快取)"""
+        # 簡單清理可能的 Markdown 標籤
+        clean_json = response.strip()
+        if clean_json.startswith("```json"):
+            clean_json = clean_json[7:-3].strip()
+        elif clean_json.startswith("```"):
+            clean_json = clean_json[3:-3].strip()
+        
+        data = json.loads(clean_json)
+        if not isinstance(data, dict):
+            raise ValueError("提煉結果不是 JSON 物件")
+        return data
+
+    async def _refine_safe(self, article: Article, semaphore: asyncio.Semaphore) -> Article:
+        """在並行額度內提煉單篇文章；失敗時回傳原文章，不影響其他文章"""
+        async with semaphore:
+            try:
+                return await self.refine(article)
+            except Exception as e:
+                logger.error(f"❌ 提煉失敗: {article.title} | {e}")
+                return article
+
+    async def refine_stream(self, articles: List[Article], top_n: int = 3) -> AsyncIterator[Article]:
+        """並行提煉高得分文章，依完成順序逐篇產出
+
+        呼叫端中途拋出例外或停止迭代時 (應以 contextlib.aclosing 包住)，
+        取消尚未完成的提煉，不再繼續呼叫 LLM。
+        """
+        semaphore = asyncio.Semaphore(max(1, config.llm_max_in_flight))
+        tasks = [asyncio.create_task(self._refine_safe(art, semaphore)) for art in articles[:top_n]]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def batch_refine(self, articles: List[Article], top_n: int = 3) -> List[Article]:
-        """批量處理高得分文章"""
-        refined_articles = []
-        for art in articles[:top_n]:
-            refined = await self.refine(art)
-            refined_articles.append(refined)
-        return refined_articles
+        """批量處理高得分文章 (並行執行，結果維持輸入順序)"""
+        semaphore = asyncio.Semaphore(max(1, config.llm_max_in_flight))
+        return list(await asyncio.gather(*(self._refine_safe(art, semaphore) for art in articles[:top_n])))
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+from loguru import logger
+
+
+class TokenBucket:
+    """權杖桶限流器
+
+    以固定速率補充權杖、允許短暫突發；收到閘道節流 (429 / Retry-After) 時
+    由 pause() 讓所有等待中的請求一起暫停，避免持續撞牆。
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """取得一個權杖，必要時等待"""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """暫停發放權杖 seconds 秒並清空現有權杖"""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+            logger.warning(f"🚦 閘道節流，暫停發送 {seconds:.1f}s")
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """解析 Retry-After 標頭 (秒數或 HTTP 日期)，無法解析時回傳預設值"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
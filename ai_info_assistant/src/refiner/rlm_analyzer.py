@@ -5,6 +5,7 @@ RLM 深度分析模組
 """
 
 import asyncio
+from concurrent.futures import Executor
 from typing import Optional
 from loguru import logger
 
@@ -55,8 +56,12 @@ class RLMAnalyzer:
             max_depth=1
         )
 
-    async def analyze(self, title: str, summary: str, url: str) -> str:
-        """對文章進行深度分析"""
+    async def analyze(self, title: str, summary: str, url: str, executor: Optional[Executor] = None) -> str:
+        """對文章進行深度分析 (executor 指定執行 RLM 的執行緒池，預設為事件迴圈的預設池)
+
+        分析失敗時拋出例外，由呼叫端 (分析任務佇列) 將任務標記為失敗，
+        錯誤訊息不會被當成分析結果寫入文章。
+        """
         # Context 資訊 (會被 RLM 存入 context 變數)
         context_data = f"""論文標題: {title}
 摘要內容: {summary}
@@ -83,15 +88,15 @@ class RLMAnalyzer:
         
         try:
             # 使用 root_prompt 參數來分離指令與資料
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor,
                 lambda: self.rlm.completion(prompt=context_data, root_prompt=query)
             )
             logger.success(f"✅ RLM 分析完成: {title[:50]}...")
             return result.response
         except Exception as e:
             logger.error(f"❌ RLM 分析失敗: {e}")
-            return f"分析過程中發生錯誤: {str(e)}"
+            raise
 
 
 # 單例實例
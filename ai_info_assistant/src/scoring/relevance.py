@@ -1,4 +1,5 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import json
 from ..models import Article
 from ..refiner.llm import LLMClient
@@ -6,6 +7,28 @@ from ..config import config
 from loguru import logger
 
 
+SCORING_GUIDE = """- 90-100: 高度相關，用戶必須閱讀
+- 70-89: 相關，值得推薦
+- 50-69: 部分相關
+- 0-49: 不太相關"""
+
+# 批次提示詞中每篇文章以外的固定開銷 (估算 token)
+BATCH_PROMPT_OVERHEAD_TOKENS = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 數 (中英混合文字約每 3 字元 1 token)"""
+    return len(text) // 3 + 1
+
+
+def parse_llm_json(response: str):
+    """清理 Markdown 代碼區塊後解析 LLM 回傳的 JSON"""
+    clean = response.strip()
+    if clean.startswith("```"):
+        clean = clean.split("\n", 1)[1].rsplit("```", 1)[0].strip()
+    return json.loads(clean)
+
+
 class RelevanceScorer:
     """LLM 二階段相關性評分器"""
     
@@ -14,14 +37,20 @@ class RelevanceScorer:
         self.threshold = config.relevance_threshold
 
     async def score_batch(self, articles: List[Article]) -> List[Tuple[Article, int]]:
-        """批量評估文章相關性 (0-100 分)"""
-        results = []
+        """批量評估文章相關性 (0-100 分)
+
+        以 LLM_MAX_IN_FLIGHT 限制同時進行的請求數，結果維持輸入順序。
+        """
+        if config.relevance_batch_mode:
+            return await self._score_batched(articles)
         
-        for art in articles:
-            score = await self._score_single(art)
-            results.append((art, score))
-            
-        return results
+        semaphore = asyncio.Semaphore(max(1, config.llm_max_in_flight))
+        
+        async def score_one(art: Article) -> Tuple[Article, int]:
+            async with semaphore:
+                return art, await self._score_single(art)
+        
+        return list(await asyncio.gather(*(score_one(art) for art in articles)))
 
     async def _score_single(self, article: Article) -> int:
         """評估單篇文章的相關性"""
@@ -37,22 +66,14 @@ class RelevanceScorer:
 - 摘要: {article.summary[:500]}
 
 請評估這篇文章與用戶興趣的相關性，給出 0-100 的分數：
-- 90-100: 高度相關，用戶必須閱讀
-- 70-89: 相關，值得推薦
-- 50-69: 部分相關
-- 0-49: 不太相關
+{SCORING_GUIDE}
 
 只輸出 JSON 格式：{{"score": 分數, "reason": "簡短原因"}}"""
 
         try:
-            response = await self.llm.chat_completion(system_prompt, user_prompt)
+            response = await self.llm.chat_completion(system_prompt, user_prompt, validate=self._parse_single)
             if response:
-                # 清理 JSON
-                clean = response.strip()
-                if clean.startswith("```"):
-                    clean = clean.split("\n", 1)[1].rsplit("```", 1)[0].strip()
-                data = json.loads(clean)
-                score = int(data.get("score", 50))
+                score = self._parse_single(response)
                 logger.debug(f"📊 [{article.source}] {article.title[:40]}... -> 相關性: {score}")
                 return score
         except Exception as e:
@@ -60,6 +81,120 @@ class RelevanceScorer:
         
         return 50  # 預設中等相關
 
+    @staticmethod
+    def _parse_single(response: str) -> int:
+        """解析單篇評分回應 (缺少分數或格式錯誤時拋出例外，該回應不會寫入快取)"""
+        return int(parse_llm_json(response)["score"])
+
+    async def _score_batched(self, articles: List[Article]) -> List[Tuple[Article, int]]:
+        """批次模式：多篇文章打包成單一提示詞，只針對輸出異常的文章逐篇重試"""
+        batches = self._build_batches(articles)
+        semaphore = asyncio.Semaphore(max(1, config.llm_max_in_flight))
+        
+        async def score_group(group: List[Tuple[int, Article]]) -> Dict[int, int]:
+            async with semaphore:
+                return await self._score_group(group)
+        
+        scores: Dict[int, int] = {}
+        for group_scores in await asyncio.gather(*(score_group(b) for b in batches)):
+            scores.update(group_scores)
+        
+        # 批次輸出缺漏或格式錯誤的文章，改以單篇模式重試
+        missing = [i for i in range(len(articles)) if i not in scores]
+        if missing:
+            logger.info(f"🔁 批次評分有 {len(missing)} 篇輸出異常，改以單篇重試")
+            
+            async def retry_one(i: int):
+                async with semaphore:
+                    scores[i] = await self._score_single(articles[i])
+            
+            await asyncio.gather(*(retry_one(i) for i in missing))
+        
+        logger.info(f"📦 批次評分: {len(articles)} 篇 -> {len(batches)} 次批次請求 + {len(missing)} 次重試")
+        return [(art, scores[i]) for i, art in enumerate(articles)]
+
+    def _build_batches(self, articles: List[Article]) -> List[List[Tuple[int, Article]]]:
+        """依 token 預算與批次上限切分文章 (以輸入索引作為 id)"""
+        budget = max(1, config.relevance_batch_token_budget - BATCH_PROMPT_OVERHEAD_TOKENS)
+        batches: List[List[Tuple[int, Article]]] = []
+        current: List[Tuple[int, Article]] = []
+        used = 0
+        
+        for i, art in enumerate(articles):
+            cost = estimate_tokens(self._format_item(i, art))
+            if current and (used + cost > budget or len(current) >= config.relevance_batch_max_size):
+                batches.append(current)
+                current, used = [], 0
+            current.append((i, art))
+            used += cost
+        
+        if current:
+            batches.append(current)
+        return batches
+
+    def _format_item(self, item_id: int, article: Article) -> str:
+        """批次提示詞中的單篇文章段落"""
+        return f"""[id={item_id}]
+- 標題: {article.title}
+- 來源: {article.source}
+- 摘要: {article.summary[:500]}
+"""
+
+    async def _score_group(self, group: List[Tuple[int, Article]]) -> Dict[int, int]:
+        """以單一請求評估一組文章，只回傳格式正確的 {id: score}"""
+        interests = ", ".join(config.interest_keywords[:10])
+        
+        system_prompt = "你是一位專業的科技資訊篩選助理。請評估每篇文章與用戶興趣的相關性。只輸出 JSON。"
+        
+        items = "\n".join(self._format_item(i, art) for i, art in group)
+        user_prompt = f"""用戶興趣領域：{interests}
+
+以下共有 {len(group)} 篇文章：
+
+{items}
+請逐篇評估與用戶興趣的相關性，給出 0-100 的分數：
+{SCORING_GUIDE}
+
+只輸出 JSON 陣列，每篇文章一個物件，id 必須與上方一致：
+[{{"id": 編號, "score": 分數, "reason": "簡短原因"}}, ...]"""
+
+        expected = {i for i, _ in group}
+        
+        def validate(response: str):
+            # 只快取涵蓋整組文章的批次回應；部分缺漏的回應仍會使用，但不重播
+            if self._parse_group(response, expected).keys() != expected:
+                raise ValueError("批次回應缺少部分文章")
+        
+        try:
+            response = await self.llm.chat_completion(system_prompt, user_prompt, validate=validate)
+            return self._parse_group(response, expected) if response else {}
+        except Exception as e:
+            logger.warning(f"⚠️ 批次相關性評分失敗 ({len(group)} 篇): {e}")
+            return {}
+
+    def _parse_group(self, response: str, expected: set) -> Dict[int, int]:
+        """解析批次評分回應，只回傳格式正確的 {id: score}"""
+        data = parse_llm_json(response)
+        if not isinstance(data, list):
+            raise ValueError("批次回應不是 JSON 陣列")
+        scores: Dict[int, int] = {}
+        for entry in data:
+            score = self._validate_entry(entry, expected)
+            if score is not None:
+                scores[int(entry["id"])] = score
+        return scores
+
+    def _validate_entry(self, entry, expected: set) -> Optional[int]:
+        """檢查批次輸出中的單筆結果，格式錯誤時回傳 None"""
+        try:
+            item_id = int(entry["id"])
+            score = int(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if item_id not in expected or not 0 <= score <= 100:
+            return None
+        return score
+
     def filter_relevant(self, scored_articles: List[Tuple[Article, int]]) -> List[Article]:
         """過濾出高相關性文章"""
         relevant = [art for art, score in scored_articles if score >= self.threshold]
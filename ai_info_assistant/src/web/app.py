@@ -1,17 +1,49 @@
-import sqlite3
 import json
-from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse
+import html
+import base64
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request, Response, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
+from loguru import logger
+from src.config import config
+from src.events import event_bus
+from src.http_client import close_http_clients
+from src.database.async_db import AsyncDatabaseManager
+from src.refiner.analysis_queue import AnalysisJobQueue, QueueFullError
+from src.web.response_cache import GenerationCache, make_etag, is_not_modified
 
-app = FastAPI(title="AI 資訊助理 Web UI")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 啟動 DB 執行緒 (同時確保資料表與索引已建立)
+    await db.open()
+    await analysis_jobs.start()
+    watcher = asyncio.create_task(watch_writes())
+    yield
+    watcher.cancel()
+    await analysis_jobs.stop()
+    # 關閉共享連線池
+    await close_http_clients()
+    await db.close()
+
+
+app = FastAPI(title="AI 資訊助理 Web UI", lifespan=lifespan)
 
 # 專案根目錄 (向上兩層：src/web -> src -> 專案根)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
 
 DB_PATH = PROJECT_ROOT / "data" / "assistant.db"
+db = AsyncDatabaseManager(str(DB_PATH))
+analysis_jobs = AnalysisJobQueue(db, workers=config.rlm_max_workers, max_queued=config.rlm_max_queued_jobs)
+
+# 查詢結果與渲染後頁面的快取 (寫入世代變動即失效)
+page_cache = GenerationCache()
+html_cache = GenerationCache(max_entries=64)
 
 
 # 排序選項對應
@@ -22,110 +54,312 @@ SORT_OPTIONS = {
 }
 
 
-def get_articles(limit: int = 50, source: str = None, sort: str = "newest"):
+def encode_cursor(sort_value, article_id: str) -> str:
+    """將最後一筆的 (排序值, id) 編碼為不透明的分頁游標"""
+    raw = json.dumps([sort_value, article_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """解析分頁游標，格式錯誤時回傳 400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, article_id = json.loads(raw)
+        return sort_value, str(article_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def get_article_page(limit: int = 50, source: str = None, sort: str = "newest",
+                           cursor: Optional[str] = None, generation: Optional[int] = None):
+    """Keyset 分頁讀取文章，回傳 (文章列表, 下一頁游標)
+
+    以 (排序欄位, id) 作為游標條件沿索引續讀，不使用 OFFSET，
+    因此任何深度的分頁成本都只與頁面大小成正比。
+    結果依寫入世代快取，資料未變動時不再查詢。
+    """
+    if generation is None:
+        generation = await db.get_write_generation()
+    key = (limit, source, sort, cursor)
+    cached = page_cache.get(key, generation)
+    if cached is not None:
+        return cached
+    
+    sort_col, sort_dir = SORT_OPTIONS.get(sort, ("processed_at", "DESC"))
+    op = "<" if sort_dir == "DESC" else ">"
+    
+    query = "SELECT id, title, source, ai_summary, tags, url, trust_score, processed_at, published_date FROM articles"
+    conditions = []
+    params = []
+    
+    if source and source != "all":
+        conditions.append("source = ?")
+        params.append(source)
+    
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        conditions.append(f"({sort_col}, id) {op} (?, ?)")
+        params.extend([sort_value, last_id])
+    
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    
+    # 排序 (多取一筆判斷是否還有下一頁)
+    query += f" ORDER BY {sort_col} {sort_dir}, id {sort_dir} LIMIT ?"
+    params.append(limit + 1)
+    
+    rows = await db.fetchall(query, tuple(params))
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_col], last["id"])
+    
+    articles = []
+    for row in rows:
+        articles.append({
+            "id": row["id"],
+            "title": row["title"],
+            "source": row["source"],
+            "ai_summary": row["ai_summary"] or "無摘要",
+            "tags": json.loads(row["tags"]) if row["tags"] else [],
+            "url": row["url"],
+            "trust_score": row["trust_score"],
+            "processed_at": row["processed_at"]
+        })
+    page_cache.set(key, generation, (articles, next_cursor))
+    return articles, next_cursor
+
+
+async def get_articles(limit: int = 50, source: str = None, sort: str = "newest"):
     """從資料庫讀取文章，支援來源篩選與排序"""
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = "SELECT id, title, source, ai_summary, tags, url, trust_score, processed_at, published_date FROM articles"
-        params = []
-        
-        if source and source != "all":
-            query += " WHERE source = ?"
-            params.append(source)
-        
-        # 排序
-        sort_col, sort_dir = SORT_OPTIONS.get(sort, ("processed_at", "DESC"))
-        query += f" ORDER BY {sort_col} {sort_dir} LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
-        articles = []
-        for row in rows:
-            articles.append({
-                "id": row["id"],
-                "title": row["title"],
-                "source": row["source"],
-                "ai_summary": row["ai_summary"] or "無摘要",
-                "tags": json.loads(row["tags"]) if row["tags"] else [],
-                "url": row["url"],
-                "trust_score": row["trust_score"],
-                "processed_at": row["processed_at"]
-            })
-        return articles
+    articles, _ = await get_article_page(limit, source, sort)
+    return articles
+
+
+# 全文檢索 bm25 權重：title, summary, ai_summary, tags, rlm_analysis
+SEARCH_WEIGHTS = (10.0, 2.0, 4.0, 5.0, 1.0)
+
+
+def build_fts_query(q: str) -> str:
+    """將使用者輸入轉為 FTS5 查詢：每個詞以片語引號包住 (避免語法注入)，彼此為 AND
+
+    trigram 分詞器無法比對短於 3 字元的詞，這類詞會被忽略。
+    """
+    terms = [t for t in q.split() if len(t) >= 3]
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+# snippet() 的命中標記先以控制字元 (char(2) / char(3)) 佔位，HTML 跳脫原文後才換成 <mark>
+SNIPPET_OPEN, SNIPPET_CLOSE = "\x02", "\x03"
+
+
+def render_snippet(raw: str) -> str:
+    """將 FTS 片段轉為安全的 HTML：跳脫文章原文，只保留命中處的 <mark> 標記"""
+    escaped = html.escape(raw or "")
+    return escaped.replace(SNIPPET_OPEN, "<mark>").replace(SNIPPET_CLOSE, "</mark>")
+
+
+async def search_articles(q: str, source: str = None, since: str = None, until: str = None, limit: int = 20):
+    """FTS5 全文檢索，依 bm25 排序並附上命中片段 (已 HTML 跳脫，命中處以 <mark> 標示)"""
+    match = build_fts_query(q)
+    if not match:
+        raise HTTPException(status_code=400, detail="Query terms must be at least 3 characters")
+    
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    query = f"""
+        SELECT a.id, a.title, a.source, a.ai_summary, a.tags, a.url, a.trust_score,
+               a.published_date,
+               bm25(articles_fts, {weights}) AS rank,
+               snippet(articles_fts, -1, char(2), char(3), '…', 16) AS snippet
+        FROM articles_fts
+        JOIN articles a ON a.doc_id = articles_fts.rowid
+        WHERE articles_fts MATCH ?
+    """
+    params = [match]
+    
+    if source and source != "all":
+        query += " AND a.source = ?"
+        params.append(source)
+    if since:
+        query += " AND a.published_date >= ?"
+        params.append(since)
+    if until:
+        query += " AND a.published_date < ?"
+        params.append(until)
+    
+    query += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    
+    rows = await db.fetchall(query, tuple(params))
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "source": row["source"],
+            "ai_summary": row["ai_summary"] or "無摘要",
+            "tags": json.loads(row["tags"]) if row["tags"] else [],
+            "url": row["url"],
+            "trust_score": row["trust_score"],
+            "published_date": row["published_date"],
+            "rank": row["rank"],
+            "snippet": render_snippet(row["snippet"])
+        }
+        for row in rows
+    ]
+
+
+# 寫入偵測每次查詢的新文章筆數
+WATCH_PAGE_SIZE = 100
+
+
+async def watch_writes():
+    """偵測其他行程 (排程器) 的寫入並轉為 article_saved 事件
+
+    排程器在獨立行程執行，其行程內事件無法直接送達 Web 端；
+    這裡以寫入世代 (單一主鍵查詢) 判斷是否有變動，只在有 SSE 訂閱者時才查詢新文章。
+    """
+    last_generation = await db.get_write_generation()
+    # 以 (processed_at, id) 作為 keyset 游標：同一批寫入的文章共用 processed_at
+    row = await db.fetchone("SELECT processed_at, id FROM articles ORDER BY processed_at DESC, id DESC LIMIT 1")
+    last_seen = (row[0] or "", row[1]) if row else ("", "")
+    
+    while True:
+        await asyncio.sleep(config.event_watch_interval_secs)
+        try:
+            generation = await db.get_write_generation()
+            if generation == last_generation:
+                continue
+            
+            # 逐頁讀完所有新文章後才更新世代，大量寫入不會卡在第一頁
+            while True:
+                rows = await db.fetchall(
+                    "SELECT id, title, source, processed_at FROM articles "
+                    "WHERE (processed_at, id) > (?, ?) ORDER BY processed_at, id LIMIT ?",
+                    (*last_seen, WATCH_PAGE_SIZE)
+                )
+                for row in rows:
+                    last_seen = (row["processed_at"], row["id"])
+                    if event_bus.has_subscribers:
+                        event_bus.publish("article_saved", {"id": row["id"], "title": row["title"], "source": row["source"]})
+                if len(rows) < WATCH_PAGE_SIZE:
+                    break
+            last_generation = generation
+        except Exception as e:
+            logger.warning(f"⚠️ 寫入偵測失敗: {e}")
 
 
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, source: str = "all", sort: str = "newest"):
-    articles = get_articles(source=source, sort=sort)
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "articles": articles,
-        "total_count": len(articles),
-        "current_source": source,
-        "current_sort": sort
-    })
+async def home(request: Request, source: str = "all", sort: str = "newest",
+               cursor: Optional[str] = None):
+    generation = await db.get_write_generation()
+    key = ("home", source, sort, cursor)
+    etag = make_etag(generation, key)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    body = html_cache.get(key, generation)
+    if body is None:
+        articles, next_cursor = await get_article_page(source=source, sort=sort, cursor=cursor,
+                                                       generation=generation)
+        body = templates.TemplateResponse("index.html", {
+            "request": request,
+            "articles": articles,
+            "total_count": len(articles),
+            "current_source": source,
+            "current_sort": sort,
+            "next_cursor": next_cursor
+        }).body
+        html_cache.set(key, generation, body)
+    return HTMLResponse(body, headers={"ETag": etag})
 
 
 @app.get("/api/articles")
-async def api_articles(limit: int = 30):
-    return get_articles(limit)
+async def api_articles(request: Request, response: Response, limit: int = 30, source: str = None,
+                       sort: str = "newest", cursor: Optional[str] = None):
+    """文章列表 API，下一頁游標放在 X-Next-Cursor 標頭 (最後一頁則無此標頭)"""
+    generation = await db.get_write_generation()
+    etag = make_etag(generation, ("api", limit, source, sort, cursor))
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    articles, next_cursor = await get_article_page(limit, source, sort, cursor, generation)
+    response.headers["ETag"] = etag
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return articles
+
+
+@app.get("/api/search")
+async def api_search(q: str, source: str = None, since: str = None, until: str = None, limit: int = 20):
+    """全文檢索 API (since / until 為 ISO 日期，until 不含)"""
+    return await search_articles(q, source, since, until, limit)
+
+
+@app.get("/api/events")
+async def events(request: Request):
+    """Server-Sent Events：推送新文章與 RLM 分析進度"""
+    async def stream():
+        async with event_bus.subscribe() as queue:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=config.sse_keepalive_secs)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @app.delete("/api/articles/{article_id:path}")
 async def delete_article(article_id: str):
-    from src.database.storage import DatabaseManager
-    db = DatabaseManager()
-    db.delete_article(article_id)
+    await db.delete_article(article_id)
     return {"status": "success", "message": f"Article {article_id} deleted"}
 
 
 @app.post("/api/articles/{article_id:path}/analyze")
-async def analyze_article(article_id: str, background_tasks: BackgroundTasks):
-    """啟動 RLM 深度分析任務 (背景執行)"""
-    from src.database.storage import DatabaseManager
-    
-    # 獲取文章資訊
-    db = DatabaseManager()
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT title, summary, url FROM articles WHERE id = ?", (article_id,))
-        row = cursor.fetchone()
-        if not row:
-            return {"status": "error", "message": "Article not found"}
-    
-    # 背景執行分析任務
-    async def run_analysis():
-        try:
-            from src.refiner.rlm_analyzer import get_analyzer
-            analyzer = get_analyzer()
-            result = await analyzer.analyze(row["title"], row["summary"] or "", row["url"])
-            
-            # 儲存結果
-            with sqlite3.connect(str(DB_PATH)) as conn:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE articles SET rlm_analysis = ? WHERE id = ?", (result, article_id))
-                conn.commit()
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
+async def analyze_article(article_id: str):
+    """提交 RLM 深度分析任務 (進入任務佇列；同一篇文章進行中時回傳既有任務)"""
+    row = await db.fetchone("SELECT 1 FROM articles WHERE id = ?", (article_id,))
+    if not row:
+        return {"status": "error", "message": "Article not found"}
     
-    background_tasks.add_task(run_analysis)
-    return {"status": "started", "message": "Analysis started in background"}
+    try:
+        job, created = await analysis_jobs.submit(article_id)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    message = "Analysis queued" if created else "Analysis already in progress"
+    return {"status": "started", "message": message, "job": job}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: int):
+    """查詢分析任務狀態"""
+    job = await db.get_analysis_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: int):
+    """取消排隊中或執行中的分析任務"""
+    if not await analysis_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job not found or already finished")
+    return {"status": "cancelled", "job_id": job_id}
 
 
 @app.get("/api/articles/{article_id:path}/analysis")
 async def get_analysis(article_id: str):
     """獲取文章的 RLM 分析結果"""
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT rlm_analysis FROM articles WHERE id = ?", (article_id,))
-        row = cursor.fetchone()
-        if not row:
-            return {"status": "error", "message": "Article not found"}
-        return {"status": "success", "analysis": row["rlm_analysis"]}
+    row = await db.fetchone("SELECT rlm_analysis FROM articles WHERE id = ?", (article_id,))
+    if not row:
+        return {"status": "error", "message": "Article not found"}
+    return {"status": "success", "analysis": row["rlm_analysis"]}
 
@@ -0,0 +1,53 @@
+"""AnalysisJobQueue 失敗處理測試"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from src.database.async_db import AsyncDatabaseManager
+from src.models import Article
+from src.refiner.analysis_queue import AnalysisJobQueue
+from src.refiner.rlm_analyzer import RLMAnalyzer
+
+
+def failing_analyzer() -> RLMAnalyzer:
+    """RLM 呼叫失敗的分析器 (略過 RLM 初始化)"""
+    analyzer = RLMAnalyzer.__new__(RLMAnalyzer)
+    analyzer.rlm = mock.Mock(**{"completion.side_effect": RuntimeError("upstream down")})
+    return analyzer
+
+
+class AnalysisQueueFailureTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = AsyncDatabaseManager(db_path=os.path.join(self.tmp.name, "test.db"))
+        await self.db.open()
+        await self.db.save_articles([Article(
+            id="a1", title="Title", authors=["A"], summary="Summary", url="https://example.com/a1",
+            source="arxiv", published_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )])
+        self.queue = AnalysisJobQueue(self.db, workers=1)
+        await self.queue.start()
+
+    async def asyncTearDown(self):
+        await self.queue.stop()
+        await self.db.close()
+        self.tmp.cleanup()
+
+    async def test_analyzer_error_marks_job_failed(self):
+        with mock.patch("src.refiner.rlm_analyzer.get_analyzer", return_value=failing_analyzer()):
+            job, created = await self.queue.submit("a1")
+            await self.queue._queue.join()
+
+        job = await self.db.get_analysis_job(job["id"])
+        row = await self.db.fetchone("SELECT rlm_analysis FROM articles WHERE id = ?", ("a1",))
+        self.assertTrue(created)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "upstream down")
+        self.assertIsNone(row["rlm_analysis"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""RedditCrawler 逾時行為測試"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from src.crawler.reddit import RedditCrawler
+from src.database.http_cache import FeedValidatorCache
+from src.models import SourceConfig
+
+FEED = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>t3_abc12345</id>
+    <title>Fast post</title>
+    <link href="https://www.reddit.com/r/fast/comments/abc123/fast_post/"/>
+    <updated>2024-01-01T00:00:00+00:00</updated>
+  </entry>
+</feed>"""
+
+
+class RedditDeadlineTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.crawler = RedditCrawler(SourceConfig(name="reddit", params={"subreddits": ["fast", "slow"]}))
+        self.crawler.validators = FeedValidatorCache(db_path=os.path.join(self.tmp.name, "test.db"))
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            subreddit = request.url.path.split("/")[2]
+            if subreddit == "slow":
+                await asyncio.sleep(0.3)
+            return httpx.Response(200, content=FEED, headers={"etag": f"E-{subreddit}"})
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.crawler.get_client = lambda url: self.client
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.tmp.cleanup()
+
+    async def test_slow_feed_past_deadline_does_not_stage_validators(self):
+        articles, timed_out = await self.crawler.fetch_with_deadline(0.1)
+        self.crawler.discard_validators()
+        await asyncio.sleep(0.4)  # 慢速 Feed 若仍在執行，此時早已回應
+
+        self.assertTrue(timed_out)
+        self.assertEqual([a.source for a in articles], ["reddit"])
+        self.assertEqual(self.crawler.validators._pending, {})
+
+
+if __name__ == "__main__":
+    unittest.main()